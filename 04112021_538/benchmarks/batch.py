@@ -0,0 +1,59 @@
+"""
+Throughput and cost per bill of batch mode against synchronous messages.create
+calls, run offline against the fake Anthropic server.
+
+    python -m benchmarks.batch --bills 200 --in-flight 5
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+import anthropic
+
+from benchmarks.fake_anthropic import FakeAnthropicServer
+from main import MODEL, create_prompt
+from services.batch_summarizer import BatchSummarizer, token_cost
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bills", type=int, default=200)
+    parser.add_argument("--in-flight", type=int, default=5)
+    parser.add_argument("--message-latency", type=float, default=1.0)
+    parser.add_argument("--batch-latency", type=float, default=10.0)
+    args = parser.parse_args()
+
+    server = FakeAnthropicServer(args.message_latency, args.batch_latency)
+    client = anthropic.Anthropic(api_key="fake", base_url=server.start(), max_retries=0)
+
+    bill_text = "SEC. 1. SHORT TITLE. This Act may be cited as the Benchmark Act. " * 400
+    prompts = {f"118-s-{n}": create_prompt(bill_text) for n in range(1, args.bills + 1)}
+
+    def create_message(prompt):
+        return client.messages.create(
+            model=MODEL,
+            max_tokens=2048,
+            system=prompt['system_prompt'],
+            messages=[{"role": "user", "content": prompt['template']}],
+        )
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.in_flight) as executor:
+        messages = list(executor.map(create_message, prompts.values()))
+    sync_elapsed = time.perf_counter() - start
+    sync_cost = sum(token_cost(m.usage.input_tokens, m.usage.output_tokens) for m in messages)
+
+    result = BatchSummarizer(client, MODEL, poll_interval=0.5).summarize(prompts)
+    server.stop()
+
+    assert len(result.summaries) == args.bills, result.errors
+    print(f"{'':8} {'time':>9} {'bills/s':>9} {'$/bill':>10}")
+    print(f"{'sync':8} {sync_elapsed:8.1f}s {args.bills / sync_elapsed:9.2f} {sync_cost / args.bills:10.5f}")
+    print(f"{'batch':8} {result.elapsed:8.1f}s {args.bills / result.elapsed:9.2f} {result.cost / args.bills:10.5f}")
+
+
+if __name__ == "__main__":
+    main()
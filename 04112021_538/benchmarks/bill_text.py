@@ -0,0 +1,91 @@
+"""
+Compare the BeautifulSoup whole-document parse with the streaming extractor
+on a large synthetic bill XML file (omnibus-sized by default).
+
+Each extractor runs in its own subprocess so peak RSS is measured in isolation.
+
+    python -m benchmarks.bill_text --sections 40000
+"""
+import argparse
+import hashlib
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from services.bill_text import CHUNK_SIZE, extract_bill_text
+
+SECTION = """<section id="H{n}"><enum>{n}.</enum><header>Appropriations for program {n}</header>
+<subsection id="H{n}A"><enum>(a)</enum><header>In general</header><text>There are appropriated,
+out of any money in the Treasury not otherwise appropriated, $<quote>{n}000000</quote> for fiscal
+year 2025 to carry out section {n} of title 42, United States Code &#x2014; to remain available until
+expended.</text></subsection><!-- generated --><subsection id="H{n}B"><enum>(b)</enum>
+<text>The Secretary shall submit a report to the appropriate congressional committees.</text></subsection></section>
+"""
+
+
+def write_fixture(path: str, sections: int) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0"?>\n<!DOCTYPE bill PUBLIC "-//US Congress//DTDs/bill.dtd//EN" "bill.dtd">\n')
+        f.write('<bill bill-stage="Introduced-in-House"><form><legis-num>H. R. 1</legis-num></form><legis-body>\n')
+        for n in range(1, sections + 1):
+            f.write(SECTION.format(n=n))
+        f.write('</legis-body></bill>\n')
+
+
+def read_chunks(path: str):
+    with open(path, 'rb') as f:
+        yield from iter(lambda: f.read(CHUNK_SIZE), b'')
+
+
+def extract_with_soup(path: str) -> str:
+    from bs4 import BeautifulSoup
+    with open(path, 'rb') as f:
+        content = f.read()
+    return BeautifulSoup(content, 'lxml-xml').get_text(separator=' ', strip=True)
+
+
+def run_one(mode: str, path: str) -> None:
+    start = time.perf_counter()
+    text = extract_with_soup(path) if mode == 'soup' else extract_bill_text(read_chunks(path))
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{elapsed} {peak_kb} {hashlib.sha256(text.encode()).hexdigest()}")
+
+
+def measure(mode: str, path: str):
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bill_text', '--run', mode, path],
+        check=True, capture_output=True, text=True,
+    ).stdout.split()
+    return float(output[0]), int(output[1]), output[2]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sections', type=int, default=40000)
+    parser.add_argument('--run', nargs=2, metavar=('MODE', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_one(*args.run)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bill.xml')
+        write_fixture(path, args.sections)
+        print(f"fixture      {os.path.getsize(path) / 1e6:8.1f} MB")
+
+        soup_time, soup_rss, soup_hash = measure('soup', path)
+        stream_time, stream_rss, stream_hash = measure('stream', path)
+
+    assert soup_hash == stream_hash, "streaming extractor produced different text"
+    print(f"{'':12} {'time':>9} {'peak RSS':>10}")
+    print(f"{'soup':12} {soup_time:8.2f}s {soup_rss / 1024:8.1f}MB")
+    print(f"{'streaming':12} {stream_time:8.2f}s {stream_rss / 1024:8.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+A local stand-in for the Anthropic Messages and Message Batches endpoints,
+so batch mode can be exercised offline:
+
+    server = FakeAnthropicServer(message_latency=1.0, batch_latency=5.0)
+    client = anthropic.Anthropic(api_key="fake", base_url=server.start())
+    ...
+    server.stop()
+"""
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BATCH_PATH = re.compile(r"^/v1/messages/batches/(?P<id>[\w-]+)(?P<results>/results)?$")
+
+
+def fake_message(params: dict) -> dict:
+    prompt = "".join(
+        message["content"] if isinstance(message["content"], str) else json.dumps(message["content"])
+        for message in params["messages"]
+    ) + params.get("system", "")
+    text = json.dumps({
+        "overview": f"A bill summarized from {len(prompt)} characters of prompt.",
+        "shocking_elements": [f"Shocking element {i}" for i in range(1, 6)],
+    })
+    return {
+        "id": f"msg_{uuid.uuid4().hex}",
+        "type": "message",
+        "role": "assistant",
+        "model": params["model"],
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4},
+    }
+
+
+class FakeAnthropicServer:
+    def __init__(self, message_latency: float = 1.0, batch_latency: float = 5.0, port: int = 0) -> None:
+        self.message_latency = message_latency
+        self.batch_latency = batch_latency
+        self.batches = {}
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _batch_json(self, batch_id: str) -> dict:
+        batch = self.batches[batch_id]
+        ended = time.monotonic() - batch["submitted"] >= self.batch_latency
+        count = len(batch["requests"])
+        created_at = batch["created_at"]
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else count,
+                "succeeded": count if ended else 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": created_at.isoformat(),
+            "expires_at": (created_at + timedelta(days=1)).isoformat(),
+            "ended_at": datetime.now(timezone.utc).isoformat() if ended else None,
+            "cancel_initiated_at": None,
+            "archived_at": None,
+            "results_url": f"{self.url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, body, status=200, content_type="application/json"):
+                data = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _read_json(self):
+                return json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+
+            def do_POST(self):
+                if self.path.startswith("/v1/messages/batches"):
+                    batch_id = f"msgbatch_{uuid.uuid4().hex}"
+                    server.batches[batch_id] = {
+                        "requests": self._read_json()["requests"],
+                        "submitted": time.monotonic(),
+                        "created_at": datetime.now(timezone.utc),
+                    }
+                    self._send_json(server._batch_json(batch_id))
+                elif self.path.startswith("/v1/messages"):
+                    params = self._read_json()
+                    time.sleep(server.message_latency)
+                    self._send_json(fake_message(params))
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def do_GET(self):
+                match = BATCH_PATH.match(self.path.split("?")[0])
+                if not match or match["id"] not in server.batches:
+                    self._send_json({"error": "not found"}, status=404)
+                    return
+                if not match["results"]:
+                    self._send_json(server._batch_json(match["id"]))
+                    return
+                lines = [
+                    json.dumps({
+                        "custom_id": request["custom_id"],
+                        "result": {"type": "succeeded", "message": fake_message(request["params"])},
+                    })
+                    for request in server.batches[match["id"]]["requests"]
+                ]
+                self._send_json("\n".join(lines) + "\n", content_type="application/x-jsonl")
+
+        return Handler
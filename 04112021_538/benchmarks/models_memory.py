@@ -0,0 +1,97 @@
+"""
+Per-record memory footprint of the plain models (Member dataclasses, Pydantic
+Bill objects) against the columnar MemberStore / BillStore.
+
+    python -m benchmarks.models_memory --members 5000 --bills 50000
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+
+from models.legislation import BillResponse
+from models.member import Member
+from models.records import BillStore, MemberStore
+
+PARTIES = ["Democratic", "Republican", "Independent"]
+STATES = ["California", "Texas", "New York", "Florida", "Ohio", "Georgia", "Michigan", "Arizona"]
+
+
+def make_members(count):
+    return [
+        {
+            "bioguideId": f"A{n:06d}",
+            "name": f"Lastname{n}, Firstname",
+            "partyName": PARTIES[n % len(PARTIES)],
+            "state": STATES[n % len(STATES)],
+            "district": n % 40 or None,
+            "updateDate": f"2024-0{n % 9 + 1}-15T12:00:00Z",
+            "url": f"https://api.congress.gov/v3/member/A{n:06d}",
+            "depiction": {
+                "attribution": "Image courtesy of the Member",
+                "imageUrl": f"https://www.congress.gov/img/member/a{n:06d}_200.jpg",
+            },
+            "terms": {"item": [{"chamber": "House of Representatives", "startYear": 2019 + k} for k in range(3)]},
+        }
+        for n in range(count)
+    ]
+
+
+def make_bills(count):
+    return [
+        {
+            "congress": 118,
+            "latestAction": {"actionDate": f"2024-0{n % 9 + 1}-1{n % 10}", "text": "Read twice and referred to the Committee on Finance."},
+            "number": str(n + 1),
+            "originChamber": "Senate" if n % 2 else "House",
+            "originChamberCode": "S" if n % 2 else "H",
+            "title": f"A bill to amend title {n % 50} of the United States Code, and for other purposes {n}.",
+            "type": "S" if n % 2 else "HR",
+            "updateDate": f"2024-0{n % 9 + 1}-1{n % 10}",
+            "updateDateIncludingText": f"2024-0{n % 9 + 1}-1{n % 10}T12:00:00Z",
+            "url": f"https://api.congress.gov/v3/bill/118/s/{n + 1}?format=json",
+        }
+        for n in range(count)
+    ]
+
+
+def measure(build, raw):
+    """Bytes retained by build(decoded response); the decoded JSON itself is released."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(json.loads(raw))
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def report(label, baseline_bytes, compact_bytes, count):
+    print(
+        f"{label:<8} {baseline_bytes / count:10.0f} B/record {compact_bytes / count:10.0f} B/record "
+        f"{baseline_bytes / compact_bytes:6.1f}x smaller"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--members", type=int, default=5000)
+    parser.add_argument("--bills", type=int, default=50000)
+    args = parser.parse_args()
+
+    print(f"{'':8} {'before':>19} {'after':>19}")
+
+    members = json.dumps(make_members(args.members))
+    _, plain = measure(lambda data: [Member(**member) for member in data], members)
+    _, compact = measure(MemberStore.from_api, members)
+    report("members", plain, compact, args.members)
+
+    bills = json.dumps({"bills": make_bills(args.bills)})
+    _, plain = measure(lambda data: BillResponse(**data), bills)
+    _, compact = measure(BillStore.from_response, bills)
+    report("bills", plain, compact, args.bills)
+
+
+if __name__ == "__main__":
+    main()
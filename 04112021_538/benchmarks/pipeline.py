@@ -0,0 +1,89 @@
+"""
+Wall-clock comparison of the serial bill loop against the concurrent pipeline.
+
+Congress.gov and Anthropic are replaced with fakes that sleep for a fixed
+latency, so the numbers only reflect how the round trips are scheduled.
+
+    python -m benchmarks.pipeline --bills 25 --in-flight 5
+"""
+import argparse
+import json
+import os
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+from main import process_bills, process_bills_serially
+from services.rate_limiter import RateLimiter
+
+
+class FakeCongressAPI:
+    def __init__(self, latency: float, rate_limiter: RateLimiter = None) -> None:
+        self.latency = latency
+        self.rate_limiter = rate_limiter
+
+    def _round_trip(self):
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        time.sleep(self.latency)
+
+    def get_bill_text(self, congress, bill_type, bill_number, update_date=None):
+        self._round_trip()
+        return f"Text of {bill_type}{bill_number}"
+
+    def get_bill_cosponsors(self, congress, bill_type, bill_number, update_date=None):
+        self._round_trip()
+        return SimpleNamespace(cosponsors=[])
+
+    def get_bill_information(self, congress, bill_type, bill_number, update_date=None):
+        self._round_trip()
+        return SimpleNamespace(bill={"sponsors": []})
+
+
+def fake_summary(latency: float):
+    def summarize(text):
+        time.sleep(latency)
+        return json.dumps({"overview": text, "shocking_elements": []})
+    return summarize
+
+
+def run(label, results):
+    start = time.perf_counter()
+    order = [bill.number for bill, *_ in results]
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {elapsed:8.2f}s")
+    return elapsed, order
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bills", type=int, default=25)
+    parser.add_argument("--in-flight", type=int, default=5)
+    parser.add_argument("--api-latency", type=float, default=0.3)
+    parser.add_argument("--llm-latency", type=float, default=2.0)
+    parser.add_argument("--requests-per-hour", type=int, default=5000)
+    parser.add_argument("--burst", type=int, default=20)
+    args = parser.parse_args()
+
+    bills = [SimpleNamespace(congress=118, type="S", number=str(n), updateDateIncludingText="2024-01-01") for n in range(1, args.bills + 1)]
+    summarize = fake_summary(args.llm_latency)
+
+    # Both runs get a fresh limiter with the same budget, so neither starts with a drained bucket
+    def make_api():
+        return FakeCongressAPI(args.api_latency, RateLimiter.per_hour(args.requests_per_hour, args.burst))
+
+    serial_time, serial_order = run(
+        "serial", process_bills_serially(make_api(), bills, summarize)
+    )
+    concurrent_time, concurrent_order = run(
+        "concurrent",
+        process_bills(make_api(), bills, args.in_flight, summarize),
+    )
+
+    assert serial_order == concurrent_order, "concurrent pipeline changed the bill order"
+    print(f"speedup      {serial_time / concurrent_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Bulk-ingest every bill of a congress and bill type into the Legislation table.
+
+Progress is checkpointed to disk after each stored batch as a watermark (the
+last stored updateDate and the bill ids stored at it), so an interrupted run
+resumes with fromDateTime from the last stored bill:
+
+    python ingest.py --congress 118 --type hr
+"""
+import argparse
+import json
+import os
+from dotenv import load_dotenv
+from services.congress_api import CongressAPI
+from services.database import DatabaseService
+
+# Load environment variables from .env file
+load_dotenv()
+
+CHECKPOINT_DIR = os.getenv('INGEST_CHECKPOINT_DIR', '.cache/ingest')
+
+
+def load_checkpoint(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_checkpoint(path, checkpoint):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def ingest_bills(api, db, congress, bill_type, batch_size, checkpoint_path):
+    """
+    Stream all bills page by page and upsert them in batches of at least batch_size.
+    The watermark is only advanced once a batch has been stored.
+    """
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint.get('complete'):
+        print(f"{congress} {bill_type} was already fully ingested ({checkpoint['ingested']} bills). Use --restart to run again.")
+        return checkpoint
+
+    cursor = checkpoint.get('cursor')
+    ingested = checkpoint.get('ingested', 0)
+    if cursor:
+        print(f"Resuming after {ingested} bills from bills updated at {cursor['updated_since']}")
+
+    batch = []
+    for bills, next_cursor in api.iter_bill_pages(congress, bill_type, **(cursor or {})):
+        batch.extend(db.prepare_bill_data(bill) for bill in bills)
+        if len(batch) < batch_size and next_cursor is not None:
+            continue
+
+        if not db.store_legislation(batch):
+            resume_from = cursor['updated_since'] if cursor else 'the first page'
+            raise RuntimeError(f"Storing a batch failed. Rerun to resume from {resume_from}.")
+
+        ingested += len(batch)
+        batch = []
+        cursor = next_cursor
+        checkpoint = {
+            'congress': congress,
+            'bill_type': bill_type,
+            'cursor': cursor,
+            'ingested': ingested,
+            'complete': cursor is None,
+        }
+        save_checkpoint(checkpoint_path, checkpoint)
+        print(f"Ingested {ingested} bills")
+
+    return checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest every bill of a congress into the Legislation table")
+    parser.add_argument("--congress", type=int, default=118)
+    parser.add_argument("--type", dest="bill_type", default="s", help="bill type, e.g. hr, s, hjres")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--restart", action="store_true", help="ignore the saved checkpoint")
+    args = parser.parse_args()
+
+    api_key = os.getenv('CONGRESS_API_KEY')
+    if not api_key:
+        raise ValueError("API key not found. Please set the API_KEY environment variable.")
+
+    api = CongressAPI(api_key)
+    db = DatabaseService()
+
+    checkpoint_path = os.path.join(CHECKPOINT_DIR, f"bills-{args.congress}-{args.bill_type.lower()}.json")
+    if args.restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    ingest_bills(api, db, args.congress, args.bill_type, args.batch_size, checkpoint_path)
+
+
+if __name__ == "__main__":
+    main()
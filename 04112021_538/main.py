@@ -2,11 +2,16 @@ import os
 from dotenv import load_dotenv
 from services.congress_api import CongressAPI
 from services.database import DatabaseService
+from services.rate_limiter import RateLimiter
+from services.http_cache import HttpCache
+from services.bill_text import CHUNK_SIZE, extract_bill_text
+from services.summary_cache import SummaryCache
+from services.batch_summarizer import BatchSummarizer
+from concurrent.futures import ThreadPoolExecutor
+import argparse
 import time
 import json
 import requests
-from bs4 import BeautifulSoup
-import lxml
 import anthropic
 from termcolor import colored
 
@@ -15,15 +20,12 @@ load_dotenv()
 
 def get_bill_text_from_xml(xml_url):
     try:
-        # Fetch the XML content
-        response = requests.get(xml_url)
+        # Stream the XML content instead of loading it all at once
+        response = requests.get(xml_url, stream=True)
         response.raise_for_status()  # Raise an exception for bad status codes
         
-        # Parse XML with BeautifulSoup using lxml parser
-        soup = BeautifulSoup(response.content, 'lxml-xml')
-        
         # Extract all text content, removing XML tags
-        text_content = soup.get_text(separator=' ', strip=True)
+        text_content = extract_bill_text(response.iter_content(chunk_size=CHUNK_SIZE))
         
         return text_content
     except requests.RequestException as e:
@@ -45,13 +47,31 @@ def create_prompt(bill_text):
     }
 
 
+MODEL = "claude-3-5-sonnet-20241022"
+
 client_anthropic = anthropic.Client(api_key=os.getenv('ANTHROPIC_API_KEY'))
+summary_cache = SummaryCache()
+
+def is_valid_summary(summary):
+    """Whether a model reply parses as the JSON summary the callers load."""
+    try:
+        json.loads(summary)
+    except json.JSONDecodeError:
+        return False
+    return True
 
 def get_summary(text):
     prompt = create_prompt(text)
+
+    # The filled-in template covers both the prompt and the bill text version
+    cache_key = SummaryCache.make_key(MODEL, prompt['system_prompt'], prompt['template'])
+    cached_summary = summary_cache.get(cache_key)
+    if cached_summary is not None and is_valid_summary(cached_summary):
+        return cached_summary
+
     # Updated Anthropic API call
     message = client_anthropic.messages.create(
-        model="claude-3-5-sonnet-20241022",
+        model=MODEL,
         max_tokens=2048,
         system = prompt['system_prompt'],
         messages=[
@@ -59,7 +79,11 @@ def get_summary(text):
         ]
     )
     # Extract just the text content from the TextBlock
-    return message.content[0].text
+    summary = message.content[0].text
+    # Only cache replies the callers can parse, so a bad reply is retried next run
+    if is_valid_summary(summary):
+        summary_cache.set(cache_key, summary)
+    return summary
 
 def print_bill_details(bill_one, bill_info, bill_cosponsors, summary_json):
     # Get unique parties from all sponsors
@@ -90,12 +114,109 @@ def print_bill_details(bill_one, bill_info, bill_cosponsors, summary_json):
     for i, element in enumerate(summary_json["shocking_elements"], 1):
         print(f"{i}. {element}")
 
+def fetch_bill(api, bill, fetch_pool):
+    """Fetch a bill's text, cosponsors and details at the same time."""
+    congress = bill.congress
+    bill_number = bill.number
+    bill_type = bill.type
+    update_date = bill.updateDateIncludingText
+
+    text_future = fetch_pool.submit(api.get_bill_text, congress, bill_type, bill_number, update_date)
+    cosponsors_future = fetch_pool.submit(api.get_bill_cosponsors, congress, bill_type, bill_number, update_date)
+    info_future = fetch_pool.submit(api.get_bill_information, congress, bill_type, bill_number, update_date)
+
+    return text_future.result(), info_future.result(), cosponsors_future.result()
+
+def process_bill(api, bill, fetch_pool, summarize=None):
+    """Fetch a bill's text, cosponsors and details at the same time, then summarize it."""
+    summarize = summarize or get_summary
+    bill_text, bill_info, bill_cosponsors = fetch_bill(api, bill, fetch_pool)
+    summary_json = json.loads(summarize(bill_text))
+    return bill, bill_info, bill_cosponsors, summary_json
+
+def process_bills(api, bills, max_in_flight, summarize=None):
+    """
+    Keep up to max_in_flight bills moving through fetch + summarize at once.
+    Yields (bill, bill_info, bill_cosponsors, summary_json) in the original bill order.
+    """
+    with ThreadPoolExecutor(max_workers=max_in_flight) as bill_pool, \
+         ThreadPoolExecutor(max_workers=max_in_flight * 3) as fetch_pool:
+        futures = [bill_pool.submit(process_bill, api, bill, fetch_pool, summarize) for bill in bills]
+        for future in futures:
+            yield future.result()
+
+def batch_custom_id(bill):
+    return f"{bill.congress}-{bill.type}-{bill.number}".lower()
+
+def process_bills_in_batch(api, bills, max_in_flight, summarizer):
+    """
+    Fetch every bill concurrently, then summarize all cache misses as one Message Batch.
+    Yields (bill, bill_info, bill_cosponsors, summary_json) in the original bill order.
+    """
+    with ThreadPoolExecutor(max_workers=max_in_flight) as bill_pool, \
+         ThreadPoolExecutor(max_workers=max_in_flight * 3) as fetch_pool:
+        fetched = list(bill_pool.map(lambda bill: fetch_bill(api, bill, fetch_pool), bills))
+
+    summaries = {}
+    prompts = {}
+    cache_keys = {}
+    for bill, (bill_text, _, _) in zip(bills, fetched):
+        custom_id = batch_custom_id(bill)
+        prompt = create_prompt(bill_text)
+        cache_keys[custom_id] = SummaryCache.make_key(MODEL, prompt['system_prompt'], prompt['template'])
+        cached_summary = summary_cache.get(cache_keys[custom_id])
+        if cached_summary is not None and is_valid_summary(cached_summary):
+            summaries[custom_id] = cached_summary
+        else:
+            prompts[custom_id] = prompt
+
+    result = summarizer.summarize(prompts)
+    for custom_id, summary in result.summaries.items():
+        if not is_valid_summary(summary):
+            result.errors[custom_id] = 'reply is not valid JSON'
+            continue
+        summary_cache.set(cache_keys[custom_id], summary)
+        summaries[custom_id] = summary
+    if prompts:
+        print(result.report())
+
+    for bill, (_, bill_info, bill_cosponsors) in zip(bills, fetched):
+        custom_id = batch_custom_id(bill)
+        if custom_id not in summaries:
+            print(f"No summary for {custom_id}: {result.errors.get(custom_id, 'missing')}")
+            continue
+        yield bill, bill_info, bill_cosponsors, json.loads(summaries[custom_id])
+
+def process_bills_serially(api, bills, summarize=None):
+    """The original one-bill-at-a-time loop, kept as a baseline for benchmarks."""
+    summarize = summarize or get_summary
+    for bill in bills:
+        update_date = bill.updateDateIncludingText
+        bill_text = api.get_bill_text(bill.congress, bill.type, bill.number, update_date)
+        bill_cosponsors = api.get_bill_cosponsors(bill.congress, bill.type, bill.number, update_date)
+        bill_info = api.get_bill_information(bill.congress, bill.type, bill.number, update_date)
+        yield bill, bill_info, bill_cosponsors, json.loads(summarize(bill_text))
+
 def main():
+    parser = argparse.ArgumentParser(description="Summarize recent bills")
+    parser.add_argument("--batch", action="store_true", help="summarize all bills as one Message Batch")
+    args = parser.parse_args()
+
     api_key = os.getenv('CONGRESS_API_KEY')
     if not api_key:
         raise ValueError("API key not found. Please set the API_KEY environment variable.")
     
-    api: CongressAPI = CongressAPI(api_key)
+    # Congress.gov allows 5,000 requests per hour per key
+    requests_per_hour = int(os.getenv('CONGRESS_API_REQUESTS_PER_HOUR', 5000))
+    burst = int(os.getenv('CONGRESS_API_BURST', 20))
+    max_in_flight = int(os.getenv('MAX_BILLS_IN_FLIGHT', 5))
+    cache_dir = os.getenv('CONGRESS_CACHE_DIR', '.cache/congress')
+
+    api: CongressAPI = CongressAPI(
+        api_key,
+        rate_limiter=RateLimiter.per_hour(requests_per_hour, burst),
+        cache=HttpCache(cache_dir),
+    )
     db = DatabaseService()
     
     # Get existing members from the database
@@ -107,20 +228,20 @@ def main():
     
     bill_data = api.get_bills(NUM_BILLS, CONGRESS, TYPE)
 
-    for bill in bill_data.bills:
-        congress = bill.congress
-        bill_number = bill.number
-        bill_type = bill.type
+    if args.batch:
+        summarizer = BatchSummarizer(client_anthropic, MODEL, poll_interval=float(os.getenv('BATCH_POLL_INTERVAL', 30)))
+        results = process_bills_in_batch(api, bill_data.bills, max_in_flight, summarizer)
+    else:
+        results = process_bills(api, bill_data.bills, max_in_flight)
 
-        bill_text = api.get_bill_text(congress, bill_type, bill_number)
-        bill_cosponsors = api.get_bill_cosponsors(congress, bill_type, bill_number)
-        bill_info = api.get_bill_information(congress, bill_type, bill_number)
-        
-        summary_json = json.loads(get_summary(bill_text))
+    for bill, bill_info, bill_cosponsors, summary_json in results:
         print_bill_details(bill, bill_info, bill_cosponsors, summary_json)
         
         # Add a separator between bills
         print("\n" + "="*80 + "\n")
 
+    stats = summary_cache.stats()
+    print(f"Summary cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,232 @@
+"""
+Column-oriented stores for members and bills. CongressAPI.iter_bill_pages builds
+each page of the bill listing as a BillStore, so ingest.py and sync.py read bills
+through BillRecord views instead of a Pydantic model per row. MemberStore is not
+used outside benchmarks/models_memory.py yet, which compares the memory use of
+both stores against the Member and Bill models.
+"""
+import json
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from models.enums import LegislationType
+from models.legislation import BillLatestAction
+from models.member import Member
+
+
+class Categories:
+    """Interns a small set of repeated values (parties, states, bill types) as integer codes."""
+
+    __slots__ = ('_codes', 'values')
+
+    def __init__(self) -> None:
+        self._codes: Dict[Any, int] = {}
+        self.values: List[Any] = []
+
+    def code(self, value: Any) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class LazyJson:
+    """Nested JSON kept as compact encoded bytes and only decoded when accessed."""
+
+    __slots__ = ('_column',)
+
+    def __init__(self) -> None:
+        self._column: List[Optional[bytes]] = []
+
+    def append(self, value: Any) -> None:
+        self._column.append(json.dumps(value, separators=(',', ':')).encode() if value else None)
+
+    def get(self, index: int, default: Any = None) -> Any:
+        raw = self._column[index]
+        return json.loads(raw) if raw is not None else default
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+
+class MemberRecord:
+    """Read-only view of one row of a MemberStore, with the same attributes as Member."""
+
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store: 'MemberStore', index: int) -> None:
+        self._store = store
+        self._index = index
+
+    bioguideId = property(lambda self: self._store.bioguide_ids[self._index])
+    name = property(lambda self: self._store.names[self._index])
+    partyName = property(lambda self: self._store.parties.values[self._store.party_codes[self._index]])
+    state = property(lambda self: self._store.states.values[self._store.state_codes[self._index]])
+    updateDate = property(lambda self: self._store.update_dates.values[self._store.update_date_codes[self._index]])
+    url = property(lambda self: self._store.urls[self._index])
+    depiction = property(lambda self: self._store.depictions.get(self._index, {}))
+    terms = property(lambda self: self._store.terms.get(self._index, {}))
+    district = property(lambda self: self._store.districts.values[self._store.district_codes[self._index]])
+
+    def to_member(self) -> Member:
+        return Member(
+            bioguideId=self.bioguideId,
+            name=self.name,
+            partyName=self.partyName,
+            state=self.state,
+            depiction=self.depiction,
+            terms=self.terms,
+            updateDate=self.updateDate,
+            url=self.url,
+            district=self.district,
+        )
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.partyName}) - {self.state} - {self.bioguideId}"
+
+
+class MemberStore:
+    """
+    Column-oriented store for many members. Party, state, update date and district are
+    interned categories stored as small integer codes (district keeps the value exactly as
+    the API or Member gave it) and the nested depiction/terms dicts stay JSON-encoded until
+    a record asks for them.
+    """
+
+    def __init__(self) -> None:
+        self.bioguide_ids: List[str] = []
+        self.names: List[str] = []
+        self.urls: List[Optional[str]] = []
+        self.parties = Categories()
+        self.party_codes = array('B')
+        self.states = Categories()
+        self.state_codes = array('B')
+        self.update_dates = Categories()
+        self.update_date_codes = array('I')
+        self.districts = Categories()
+        self.district_codes = array('B')
+        self.depictions = LazyJson()
+        self.terms = LazyJson()
+
+    @classmethod
+    def from_api(cls, members: Iterable[Union[Dict[str, Any], Member]]) -> 'MemberStore':
+        store = cls()
+        store.extend(members)
+        return store
+
+    def append(self, member: Union[Dict[str, Any], Member]) -> None:
+        if isinstance(member, Member):
+            member = member.__dict__
+        self.bioguide_ids.append(member['bioguideId'])
+        self.names.append(member['name'])
+        self.urls.append(member.get('url'))
+        self.party_codes.append(self.parties.code(_intern(member['partyName'])))
+        self.state_codes.append(self.states.code(_intern(member['state'])))
+        self.update_date_codes.append(self.update_dates.code(member.get('updateDate')))
+        self.district_codes.append(self.districts.code(member.get('district')))
+        self.depictions.append(member.get('depiction'))
+        self.terms.append(member.get('terms'))
+
+    def extend(self, members: Iterable[Union[Dict[str, Any], Member]]) -> None:
+        for member in members:
+            self.append(member)
+
+    def __len__(self) -> int:
+        return len(self.bioguide_ids)
+
+    def __getitem__(self, index: int) -> MemberRecord:
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return MemberRecord(self, index % len(self))
+
+    def __iter__(self) -> Iterator[MemberRecord]:
+        return (MemberRecord(self, index) for index in range(len(self)))
+
+
+class BillRecord:
+    """Read-only view of one row of a BillStore, with the same attributes as legislation.Bill."""
+
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store: 'BillStore', index: int) -> None:
+        self._store = store
+        self._index = index
+
+    congress = property(lambda self: self._store.congresses[self._index])
+    number = property(lambda self: str(self._store.numbers[self._index]))
+    title = property(lambda self: self._store.titles[self._index])
+    type = property(lambda self: self._store.types.values[self._store.type_codes[self._index]])
+    originChamber = property(lambda self: self._store.chambers.values[self._store.chamber_codes[self._index]])
+    originChamberCode = property(lambda self: self.originChamber[0] if self.originChamber else None)
+    updateDate = property(lambda self: self._store.update_dates.values[self._store.update_date_codes[self._index]])
+    updateDateIncludingText = property(
+        lambda self: self._store.update_dates.values[self._store.text_update_date_codes[self._index]]
+    )
+    url = property(lambda self: self._store.urls[self._index])
+
+    @property
+    def latestAction(self) -> Optional[BillLatestAction]:
+        action = self._store.latest_actions.get(self._index)
+        return BillLatestAction(**action) if action else None
+
+
+class BillStore:
+    """
+    Column-oriented store for bills from the /bill listing, built straight from the
+    response JSON without a Pydantic model per row. Bill type, chamber and dates are
+    interned categories; latestAction stays JSON-encoded until accessed.
+    """
+
+    def __init__(self) -> None:
+        self.congresses = array('H')
+        self.numbers = array('I')
+        self.titles: List[str] = []
+        self.urls: List[str] = []
+        self.types = Categories()
+        self.type_codes = array('B')
+        self.chambers = Categories()
+        self.chamber_codes = array('B')
+        self.update_dates = Categories()
+        self.update_date_codes = array('I')
+        self.text_update_date_codes = array('I')
+        self.latest_actions = LazyJson()
+
+    @classmethod
+    def from_response(cls, data: Dict[str, Any]) -> 'BillStore':
+        store = cls()
+        store.extend(data['bills'])
+        return store
+
+    def append(self, bill: Dict[str, Any]) -> None:
+        self.congresses.append(int(bill['congress']))
+        self.numbers.append(int(bill['number']))
+        self.titles.append(bill['title'])
+        self.urls.append(bill['url'])
+        try:
+            # Share the enum's value string across every bill of the same type
+            bill_type = LegislationType(bill['type'].upper()).value
+        except ValueError:
+            bill_type = _intern(bill['type'])
+        self.type_codes.append(self.types.code(bill_type))
+        self.chamber_codes.append(self.chambers.code(_intern(bill.get('originChamber'))))
+        self.update_date_codes.append(self.update_dates.code(bill.get('updateDate')))
+        self.text_update_date_codes.append(self.update_dates.code(bill.get('updateDateIncludingText')))
+        self.latest_actions.append(bill.get('latestAction'))
+
+    def extend(self, bills: Iterable[Dict[str, Any]]) -> None:
+        for bill in bills:
+            self.append(bill)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def __getitem__(self, index: int) -> BillRecord:
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return BillRecord(self, index % len(self))
+
+    def __iter__(self) -> Iterator[BillRecord]:
+        return (BillRecord(self, index) for index in range(len(self)))
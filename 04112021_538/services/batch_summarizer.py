@@ -0,0 +1,103 @@
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+# claude-3-5-sonnet list prices in USD per million tokens; batches are billed at 50%
+INPUT_COST_PER_MTOK = 3.0
+OUTPUT_COST_PER_MTOK = 15.0
+BATCH_DISCOUNT = 0.5
+
+BATCHES_BETA = "message-batches-2024-09-24"
+
+
+def token_cost(input_tokens: int, output_tokens: int, batch: bool = False) -> float:
+    cost = (input_tokens * INPUT_COST_PER_MTOK + output_tokens * OUTPUT_COST_PER_MTOK) / 1_000_000
+    return cost * BATCH_DISCOUNT if batch else cost
+
+
+@dataclass
+class BatchResult:
+    summaries: Dict[str, str] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    input_tokens: int = 0
+    output_tokens: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def cost(self) -> float:
+        return token_cost(self.input_tokens, self.output_tokens, batch=True)
+
+    def report(self) -> str:
+        count = len(self.summaries) or 1
+        return (
+            f"Batch: {len(self.summaries)} summaries, {len(self.errors)} errors in {self.elapsed:.1f}s "
+            f"({len(self.summaries) / max(self.elapsed, 1e-9):.2f} bills/s), "
+            f"${self.cost:.4f} total, ${self.cost / count:.5f} per bill"
+        )
+
+
+class BatchSummarizer:
+    """
+    Summarize many prompts as one Message Batch: submit, poll until the batch
+    has ended, then map results back by custom_id.
+    """
+
+    def __init__(self, client, model: str, max_tokens: int = 2048, poll_interval: float = 30.0) -> None:
+        self.client = client
+        self.model = model
+        self.max_tokens = max_tokens
+        self.poll_interval = poll_interval
+
+    def submit(self, prompts: Dict[str, dict]) -> str:
+        """prompts maps a custom_id to a create_prompt() dict; returns the batch id."""
+        batch = self.client.beta.messages.batches.create(
+            betas=[BATCHES_BETA],
+            requests=[
+                {
+                    "custom_id": custom_id,
+                    "params": {
+                        "model": self.model,
+                        "max_tokens": self.max_tokens,
+                        "system": prompt['system_prompt'],
+                        "messages": [{"role": "user", "content": prompt['template']}],
+                    },
+                }
+                for custom_id, prompt in prompts.items()
+            ],
+        )
+        print(f"Submitted batch {batch.id} with {len(prompts)} requests")
+        return batch.id
+
+    def wait(self, batch_id: str, timeout: Optional[float] = None) -> None:
+        start = time.monotonic()
+        while True:
+            batch = self.client.beta.messages.batches.retrieve(batch_id, betas=[BATCHES_BETA])
+            if batch.processing_status == "ended":
+                return
+            if timeout is not None and time.monotonic() - start > timeout:
+                raise TimeoutError(f"Batch {batch_id} did not finish within {timeout}s")
+            counts = batch.request_counts
+            print(f"Batch {batch_id}: {counts.processing} processing, {counts.succeeded} succeeded")
+            time.sleep(self.poll_interval)
+
+    def collect(self, batch_id: str, result: BatchResult) -> BatchResult:
+        for entry in self.client.beta.messages.batches.results(batch_id, betas=[BATCHES_BETA]):
+            if entry.result.type == "succeeded":
+                message = entry.result.message
+                result.summaries[entry.custom_id] = message.content[0].text
+                result.input_tokens += message.usage.input_tokens
+                result.output_tokens += message.usage.output_tokens
+            else:
+                result.errors[entry.custom_id] = entry.result.type
+        return result
+
+    def summarize(self, prompts: Dict[str, dict], timeout: Optional[float] = None) -> BatchResult:
+        result = BatchResult()
+        if not prompts:
+            return result
+        start = time.perf_counter()
+        batch_id = self.submit(prompts)
+        self.wait(batch_id, timeout)
+        self.collect(batch_id, result)
+        result.elapsed = time.perf_counter() - start
+        return result
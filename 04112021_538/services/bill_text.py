@@ -0,0 +1,70 @@
+from typing import Iterable, Iterator, List
+from lxml import etree
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _TextCollector:
+    """
+    lxml parser target that produces the same strings as
+    BeautifulSoup(xml, 'lxml-xml').get_text(separator=' ', strip=True)
+    without building a tree: character data is buffered until the next tag,
+    comment or processing instruction, then stripped and kept if non-empty.
+    """
+
+    def __init__(self) -> None:
+        self._buffer: List[str] = []
+        self._segments: List[str] = []
+
+    def _flush(self) -> None:
+        if self._buffer:
+            text = ''.join(self._buffer).strip()
+            self._buffer.clear()
+            if text:
+                self._segments.append(text)
+
+    def start(self, tag, attrib, nsmap=None) -> None:
+        self._flush()
+
+    def end(self, tag) -> None:
+        self._flush()
+
+    def data(self, data: str) -> None:
+        self._buffer.append(data)
+
+    def comment(self, text: str) -> None:
+        self._flush()
+
+    def pi(self, target: str, data: str = None) -> None:
+        self._flush()
+
+    def close(self) -> None:
+        self._flush()
+
+    def drain(self) -> List[str]:
+        segments, self._segments = self._segments, []
+        return segments
+
+
+def iter_bill_text(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Yield the text segments of a bill XML document as its bytes arrive."""
+    collector = _TextCollector()
+    # Same parser settings BeautifulSoup uses for 'lxml-xml'
+    parser = etree.XMLParser(target=collector, strip_cdata=False, recover=True)
+
+    fed = False
+    for chunk in chunks:
+        if not chunk:
+            continue
+        parser.feed(chunk)
+        fed = True
+        yield from collector.drain()
+
+    if fed:
+        parser.close()
+        yield from collector.drain()
+
+
+def extract_bill_text(chunks: Iterable[bytes]) -> str:
+    """Return all text in a bill XML document, space separated, with bounded memory."""
+    return ' '.join(iter_bill_text(chunks))
@@ -1,6 +1,10 @@
 import requests
-import time
-from typing import List, Union, Optional
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union, Optional
+from services.rate_limiter import RateLimiter
+from services.http_cache import HttpCache, MISSING
+from services.bill_text import CHUNK_SIZE, extract_bill_text
+from services.sync_state import normalize_update_date
 from models.member import Member
 from models.legislation import (    
     BillResponse,
@@ -10,55 +14,183 @@ from models.bill import (
     CosponsorResponse,
     BillDetailResponse
 )
+from models.records import BillRecord, BillStore
 
 class CongressAPI:
     BASE_URL: str = "https://api.congress.gov/v3"
+    # Congress.gov allows 5,000 requests per hour per key
+    DEFAULT_REQUESTS_PER_HOUR: int = 5000
+    MAX_PAGE_SIZE: int = 250
     
-    def __init__(self, api_key: str) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[HttpCache] = None,
+    ) -> None:
         self.session: requests.Session = requests.Session()
         self.session.headers.update({'X-Api-Key': api_key})
+        self.rate_limiter = rate_limiter or RateLimiter.per_hour(self.DEFAULT_REQUESTS_PER_HOUR, burst=20)
+        self.cache = cache
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """GET a URL, waiting on the shared rate budget and adapting it to the rate-limit headers."""
+        self.rate_limiter.acquire()
+        response = self.session.get(url, **kwargs)
+        self.rate_limiter.update_from_headers(response.headers)
+        response.raise_for_status()
+        return response
+
+    def _fetch(self, url: str, version: Optional[str] = None) -> bytes:
+        """
+        Return the body for a URL, going through the on-disk cache when one is configured.
+        If the cached copy was stored for the same version (a bill's updateDateIncludingText)
+        it is returned without a request; otherwise it is revalidated with a conditional GET.
+        """
+        if not self.cache:
+            return self._get(url).content
+
+        entry = self.cache.lookup(url)
+        if entry and version and entry.version == version:
+            return self.cache.read(entry)
+
+        response = self._get(url, headers=self.cache.conditional_headers(entry))
+        if response.status_code == 304 and entry:
+            self.cache.refresh(entry, version)
+            return self.cache.read(entry)
+
+        self.cache.store(url, response.content, response.headers, version)
+        return response.content
+
+    def _stream(self, url: str, version: Optional[str] = None) -> Iterator[bytes]:
+        """Like _fetch, but yields the body in chunks as it downloads (or reads from disk)."""
+        if not self.cache:
+            yield from self._get(url, stream=True).iter_content(CHUNK_SIZE)
+            return
+
+        entry = self.cache.lookup(url)
+        if entry and version and entry.version == version:
+            yield from self.cache.iter_read(entry, CHUNK_SIZE)
+            return
+
+        response = self._get(url, stream=True, headers=self.cache.conditional_headers(entry))
+        if response.status_code == 304 and entry:
+            self.cache.refresh(entry, version)
+            yield from self.cache.iter_read(entry, CHUNK_SIZE)
+            return
+
+        yield from self.cache.store_stream(url, response.iter_content(CHUNK_SIZE), response.headers, version)
+
+    def _fetch_json(self, url: str, version: Optional[str] = None) -> dict:
+        return json.loads(self._fetch(url, version))
     
-    def get_all_members(self) -> List[Member]:
-        """Fetch all current congress members, handling pagination."""
-        members = []
+    def iter_members(self, updated_since: Optional[str] = None) -> Iterator[Member]:
+        """
+        Stream current congress members, handling pagination.
+        updated_since (YYYY-MM-DDTHH:MM:SSZ) limits results to members updated at or after it.
+        """
         NUMBER_OF_MEMBERS_TO_GET = 250
         url = f"{self.BASE_URL}/member?currentMember=True&limit={NUMBER_OF_MEMBERS_TO_GET}"
+        if updated_since:
+            url += f"&fromDateTime={updated_since}"
         
         while url:
             print("url:", url)
-            response = self.session.get(url)
-            response.raise_for_status()
-            data = response.json()
+            data = self._fetch_json(url)
             
             members_data = data['members']
-            members.extend([Member(**member) for member in members_data])
+            yield from (Member(**member) for member in members_data)
             
+            # Pacing between pages comes from the rate limiter instead of a fixed sleep
             url = data['pagination'].get('next')
-            
-            if url:
-                time.sleep(1)
-        
-        return members
+
+    def get_all_members(self) -> List[Member]:
+        """Fetch all current congress members, handling pagination."""
+        return list(self.iter_members())
     
     def get_bills(self, num_bills: str, congress: str, bill_type: str) -> BillResponse: 
         url = f"{self.BASE_URL}/bill/{congress}/{bill_type.lower()}?limit={num_bills}"
         print("url:", url)
-        response = self.session.get(url)
-        response.raise_for_status()
-        data = response.json()
+        data = self._fetch_json(url)
         return BillResponse(**data)
     
-    def get_bill_text(self, congress: str, bill_type: str, bill_number: str) -> Union[str, None]:
+    def iter_bill_pages(
+        self,
+        congress: str,
+        bill_type: str,
+        page_size: int = MAX_PAGE_SIZE,
+        updated_since: Optional[str] = None,
+        seen_ids: Iterable[str] = (),
+    ) -> Iterator[Tuple[List[BillRecord], Optional[Dict[str, Any]]]]:
+        """
+        Stream every bill of a congress and bill type, one page at a time, oldest update first.
+        Yields (bills, cursor); cursor is the watermark to resume from once the page has been
+        processed ({'updated_since', 'seen_ids'}, passed back as keyword arguments), and None
+        after the last page. updated_since (YYYY-MM-DDTHH:MM:SSZ) limits results to bills
+        updated at or after it; seen_ids are bill ids at exactly updated_since to skip.
+        Each page is read into a BillStore, so bills are BillRecord views rather than models.
+        """
+        # Offsets are not stable while bills are updated: an updated bill moves to the end of
+        # the order and every later bill shifts left, so the next offset page would skip one.
+        # Each page is instead a fresh fromDateTime query from the last stored updateDate,
+        # dropping the bills already seen at that timestamp. Only bills sharing a single
+        # timestamp are paged by offset.
+        since = normalize_update_date(updated_since)
+        seen = set(seen_ids)
+        offset = 0
+        while True:
+            url = (
+                f"{self.BASE_URL}/bill/{congress}/{bill_type.lower()}"
+                f"?limit={page_size}&offset={offset}&sort=updateDate+asc"
+            )
+            if since:
+                url += f"&fromDateTime={since}"
+            print("url:", url)
+            data = self._fetch_json(url)
+            page = BillStore.from_response(data)
+
+            query_since = since
+            bills = []
+            for bill in page:
+                bill_id = f"{bill.congress}-{bill.type}-{bill.number}".lower()
+                update_date = normalize_update_date(bill.updateDate)
+                if update_date == since and bill_id in seen:
+                    continue
+                if update_date != since:
+                    since, seen = update_date, set()
+                seen.add(bill_id)
+                bills.append(bill)
+
+            if not data.get('pagination', {}).get('next'):
+                yield bills, None
+                return
+            # A new watermark starts a fresh query; a page within one timestamp moves the offset on
+            offset = 0 if since != query_since else offset + len(page)
+            yield bills, {'updated_since': since, 'seen_ids': sorted(seen)}
+
+    def iter_bills(self, congress: str, bill_type: str, updated_since: Optional[str] = None) -> Iterator[BillRecord]:
+        for bills, _ in self.iter_bill_pages(congress, bill_type, updated_since=updated_since):
+            yield from bills
+
+    def get_bill_text(
+        self, congress: str, bill_type: str, bill_number: str, update_date: Optional[str] = None
+    ) -> Union[str, None]:
         """
         Retrieves the full text of a bill using its congress, type, and number.
         Returns the bill text as a string, or None if unavailable.
+        Pass the bill's updateDateIncludingText as update_date to reuse previously
+        extracted text until the bill changes.
         """
+        cache_key = f"bill-text/{congress}/{bill_type.lower()}/{bill_number}"
+        if self.cache and update_date:
+            cached_text = self.cache.get_value(cache_key, update_date)
+            if cached_text is not MISSING:
+                return cached_text
+
         try:
             url = f"{self.BASE_URL}/bill/{congress}/{bill_type.lower()}/{bill_number}/text"
             print("\nurl:", url, "\n")
-            response = self.session.get(url)
-            response.raise_for_status()
-            data = response.json()
+            data = self._fetch_json(url, update_date)
             text_data = BillTextResponse(**data)
 
             # Find the URL for the Formatted XML version
@@ -68,19 +200,14 @@ class CongressAPI:
                 None
             )
 
+            bill_text = None
             if xml_url:
-                # Fetch and parse the XML content
-                response = self.session.get(xml_url)
-                response.raise_for_status()
-                
-                # Parse XML with BeautifulSoup using lxml parser
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(response.content, 'lxml-xml')
-                
-                # Extract all text content, removing XML tags
-                return soup.get_text(separator=' ', strip=True)
-                
-            return None
+                # Stream the XML and extract its text as it downloads
+                bill_text = extract_bill_text(self._stream(xml_url, update_date))
+
+            if self.cache and update_date:
+                self.cache.set_value(cache_key, update_date, bill_text)
+            return bill_text
             
         except requests.RequestException as e:
             print(f"Error fetching bill text: {e}")
@@ -89,27 +216,27 @@ class CongressAPI:
             print(f"Error processing bill text: {e}")
             return None
     
-    def get_bill_cosponsors(self, congress: str, bill_type: str, bill_number: str) -> CosponsorResponse:
+    def get_bill_cosponsors(
+        self, congress: str, bill_type: str, bill_number: str, update_date: Optional[str] = None
+    ) -> CosponsorResponse:
         """
         Retrieves the cosponsors for a specific bill.
         Returns a CosponsorResponse object containing a list of Cosponsor objects.
         """
         url = f"{self.BASE_URL}/bill/{congress}/{bill_type.lower()}/{bill_number}/cosponsors"
-        response = self.session.get(url)
-        response.raise_for_status()
-        data = response.json()
+        data = self._fetch_json(url, update_date)
         return CosponsorResponse(**data)
     
-    def get_bill_information(self, congress: str, bill_type: str, bill_number: str) -> BillDetailResponse:
+    def get_bill_information(
+        self, congress: str, bill_type: str, bill_number: str, update_date: Optional[str] = None
+    ) -> BillDetailResponse:
         """
         Retrieves detailed information about a specific bill.
         Returns a BillDetailResponse object containing comprehensive bill details.
         """
         url = f"{self.BASE_URL}/bill/{congress}/{bill_type.lower()}/{bill_number}"
         print("url:", url)
-        response = self.session.get(url)
-        response.raise_for_status()
-        data = response.json()
+        data = self._fetch_json(url, update_date)
         return BillDetailResponse(**data)
     
 
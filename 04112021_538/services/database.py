@@ -12,29 +12,33 @@ class DatabaseService:
 
         self.client: Client = create_client(self.supabase_url, self.supabase_key)
 
-    def store_members(self, members_data: List[Dict[str, Any]]) -> None:
-        """Store member data in Supabase."""
+    def store_members(self, members_data: List[Dict[str, Any]]) -> bool:
+        """Store member data in Supabase. Returns False if the batch could not be stored."""
         if not members_data:
             print("No new members to add to the database.")
-            return
+            return True
 
         try:
             result = self.client.table('CongressMembers').upsert(members_data).execute()
             print(f"Successfully stored data for {len(members_data)} new members")
+            return True
         except Exception as e:
             print(f"Error batch storing members: {str(e)}")
+            return False
 
-    def store_legislation(self, legislation_data: List[Dict[str, Any]]) -> None:
-        """Store legislation data in Supabase."""
+    def store_legislation(self, legislation_data: List[Dict[str, Any]]) -> bool:
+        """Store legislation data in Supabase. Returns False if the batch could not be stored."""
         if not legislation_data:
             print("No new legislation to add to the database.")
-            return
+            return True
 
         try:
             result = self.client.table('Legislation').upsert(legislation_data).execute()
             print(f"Successfully stored {len(legislation_data)} pieces of legislation")
+            return True
         except Exception as e:
             print(f"Error batch storing legislation: {str(e)}")
+            return False
 
     def get_existing_member_ids(self) -> Set[str]:
         """Get bioguide IDs of existing members from the database."""
@@ -60,6 +64,19 @@ class DatabaseService:
             'depiction': member.depiction
         }
 
+    @staticmethod
+    def prepare_bill_data(bill) -> Dict[str, Any]:
+        """Convert a bill from a congress bill listing to database format."""
+        return {
+            'congress': bill.congress,
+            'number': bill.number,
+            'title': bill.title,
+            'type': bill.type,
+            'url': bill.url,
+            'latestAction': bill.latestAction.model_dump() if bill.latestAction else None,
+            'isAmendment': False
+        }
+
     @staticmethod
     def prepare_legislation_data(legislation, member_id: str) -> Dict[str, Any]:
         """Convert legislation object to database format."""
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+# Returned by get_value when nothing usable is cached (None is a valid cached value)
+MISSING = object()
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    digest: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    version: Optional[str] = None
+    stored_at: float = 0.0
+
+
+class HttpCache:
+    """
+    Content-addressed on-disk cache for GET responses.
+
+    Bodies live in blobs/<sha256 of content>, so identical payloads are stored once.
+    index/<sha256 of url>.json points a URL at its blob along with the ETag /
+    Last-Modified validators needed for conditional requests. values/ holds
+    derived results (e.g. extracted bill text) so they are not recomputed.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.blob_dir = os.path.join(directory, 'blobs')
+        self.index_dir = os.path.join(directory, 'index')
+        self.value_dir = os.path.join(directory, 'values')
+        for path in (self.blob_dir, self.index_dir, self.value_dir):
+            os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def _hash(value: bytes) -> str:
+        return hashlib.sha256(value).hexdigest()
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        # Write to a temp file and rename so concurrent readers never see partial files
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _index_path(self, url: str) -> str:
+        return os.path.join(self.index_dir, f"{self._hash(url.encode())}.json")
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest)
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """Return the cache entry for a URL, or None if it was never stored or its blob is gone."""
+        try:
+            with open(self._index_path(url), 'r') as f:
+                entry = CacheEntry(**json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError, TypeError):
+            return None
+        if not os.path.exists(self.blob_path(entry.digest)):
+            return None
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+        """Headers that let the server answer 304 Not Modified for a cached entry."""
+        headers = {}
+        if entry and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry and entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def read(self, entry: CacheEntry) -> bytes:
+        with open(self.blob_path(entry.digest), 'rb') as f:
+            return f.read()
+
+    def iter_read(self, entry: CacheEntry, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        with open(self.blob_path(entry.digest), 'rb') as f:
+            yield from iter(lambda: f.read(chunk_size), b'')
+
+    def store(self, url: str, content: bytes, headers, version: Optional[str] = None) -> CacheEntry:
+        """Store a response body and its validators, returning the new entry."""
+        digest = self._hash(content)
+        blob_path = self.blob_path(digest)
+        if not os.path.exists(blob_path):
+            self._write_atomic(blob_path, content)
+        return self._write_entry(CacheEntry(
+            url=url,
+            digest=digest,
+            etag=headers.get('ETag'),
+            last_modified=headers.get('Last-Modified'),
+            version=version,
+        ))
+
+    def store_stream(
+        self, url: str, chunks: Iterable[bytes], headers, version: Optional[str] = None
+    ) -> Iterator[bytes]:
+        """
+        Pass chunks through while spooling them to disk. The entry is only
+        committed once the stream has been fully consumed.
+        """
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.blob_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    f.write(chunk)
+                    yield chunk
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        blob_path = self.blob_path(digest.hexdigest())
+        if os.path.exists(blob_path):
+            os.unlink(tmp_path)
+        else:
+            os.replace(tmp_path, blob_path)
+        self._write_entry(CacheEntry(
+            url=url,
+            digest=digest.hexdigest(),
+            etag=headers.get('ETag'),
+            last_modified=headers.get('Last-Modified'),
+            version=version,
+        ))
+
+    def refresh(self, entry: CacheEntry, version: Optional[str] = None) -> CacheEntry:
+        """Mark a cached entry as revalidated (the server answered 304)."""
+        entry.version = version or entry.version
+        return self._write_entry(entry)
+
+    def _write_entry(self, entry: CacheEntry) -> CacheEntry:
+        entry.stored_at = time.time()
+        self._write_atomic(self._index_path(entry.url), json.dumps(asdict(entry)).encode())
+        return entry
+
+    def get_value(self, key: str, version: str) -> Any:
+        """Return a derived value stored for this exact version, or MISSING."""
+        path = os.path.join(self.value_dir, f"{self._hash(key.encode())}.json")
+        try:
+            with open(path, 'r') as f:
+                record = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return MISSING
+        if record.get('version') != version:
+            return MISSING
+        return record.get('value')
+
+    def set_value(self, key: str, version: str, value: Any) -> None:
+        path = os.path.join(self.value_dir, f"{self._hash(key.encode())}.json")
+        self._write_atomic(path, json.dumps({'key': key, 'version': version, 'value': value}).encode())
@@ -0,0 +1,61 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every worker hitting the same API."""
+
+    # Fraction of the server-reported budget below which requests are spread out
+    LOW_WATERMARK = 0.1
+
+    def __init__(self, rate_per_second: float, burst: int = 1, window_seconds: float = 3600) -> None:
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be positive")
+        self.rate_per_second = rate_per_second
+        self.max_rate_per_second = rate_per_second
+        self.window_seconds = window_seconds
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_hour(cls, requests_per_hour: int, burst: int = 1) -> "RateLimiter":
+        return cls(requests_per_hour / 3600, burst, window_seconds=3600)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate_per_second)
+        self._last_refill = now
+
+    def update_from_headers(self, headers) -> None:
+        """
+        Tune the rate to the server's X-RateLimit-Limit / X-RateLimit-Remaining headers.
+        While plenty of budget is left the configured rate applies; near the limit the
+        remaining requests are spread evenly over the rate-limit window.
+        """
+        try:
+            limit = int(headers['X-RateLimit-Limit'])
+            remaining = int(headers['X-RateLimit-Remaining'])
+        except (KeyError, TypeError, ValueError):
+            return
+
+        with self._lock:
+            self._refill()
+            if remaining > limit * self.LOW_WATERMARK:
+                self.rate_per_second = self.max_rate_per_second
+            else:
+                self.rate_per_second = max(remaining, 1) / self.window_seconds
+                self._tokens = min(self._tokens, remaining)
+
+    def acquire(self) -> None:
+        """Block until a request token is available."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate_per_second
+            time.sleep(wait)
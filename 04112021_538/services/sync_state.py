@@ -0,0 +1,52 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+
+def normalize_update_date(value: Optional[str]) -> Optional[str]:
+    """Normalize Congress.gov updateDate values to the YYYY-MM-DDTHH:MM:SSZ form fromDateTime expects."""
+    if not value:
+        return None
+    if len(value) == 10:
+        return f"{value}T00:00:00Z"
+    return value.split('.')[0].replace('+00:00', '').rstrip('Z') + 'Z'
+
+
+class SyncState:
+    """
+    Incremental sync state for one table: the newest updateDate seen (high-water mark)
+    and a compact fingerprint per row id, persisted as JSON. Fingerprints are 8-byte
+    BLAKE2b digests of the prepared database row, so unchanged rows can be skipped
+    without asking the database what it already holds.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        self.high_water_mark: Optional[str] = data.get('high_water_mark')
+        self.fingerprints: Dict[str, str] = data.get('fingerprints', {})
+
+    @staticmethod
+    def fingerprint(row: Dict[str, Any]) -> str:
+        encoded = json.dumps(row, sort_keys=True, default=str).encode()
+        return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+    def is_unchanged(self, row_id: str, fingerprint: str) -> bool:
+        return self.fingerprints.get(row_id) == fingerprint
+
+    def advance(self, update_date: Optional[str]) -> None:
+        update_date = normalize_update_date(update_date)
+        if update_date and (self.high_water_mark is None or update_date > self.high_water_mark):
+            self.high_water_mark = update_date
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'high_water_mark': self.high_water_mark, 'fingerprints': self.fingerprints}, f)
+        os.replace(tmp_path, self.path)
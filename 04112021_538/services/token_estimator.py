@@ -0,0 +1,113 @@
+import json
+import math
+import os
+import threading
+from typing import List, Optional, Tuple
+
+# Conservative characters-per-token ratio for English legislative text, used until calibrated
+CHARS_PER_TOKEN = 3.5
+# Relative error assumed before enough real counts have been seen
+DEFAULT_ERROR_MARGIN = 0.15
+MIN_ERROR_MARGIN = 0.02
+MIN_SAMPLES = 5
+MAX_SAMPLES = 200
+
+CALIBRATION_PATH = os.getenv('TOKEN_CALIBRATION_PATH', '.cache/token_calibration.json')
+
+
+class TokenEstimator:
+    """
+    Local Claude token estimator calibrated against real counts.
+
+    Every remote count_tokens result is recorded as a (characters, tokens) sample
+    in a small JSON file. The chars-per-token ratio is fitted to those samples and
+    the worst relative error seen on them is used as the estimate's error bound.
+    """
+
+    def __init__(self, path: Optional[str] = CALIBRATION_PATH) -> None:
+        self.path = path
+        self.samples: List[Tuple[int, int]] = []
+        self.chars_per_token = CHARS_PER_TOKEN
+        self.error_margin = DEFAULT_ERROR_MARGIN
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                self.samples = [tuple(sample) for sample in json.load(f)['samples']]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            self.samples = []
+        self._calibrate()
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump({
+                'chars_per_token': self.chars_per_token,
+                'error_margin': self.error_margin,
+                'samples': self.samples,
+            }, f)
+
+    def _calibrate(self) -> None:
+        if len(self.samples) < MIN_SAMPLES:
+            return
+        total_chars = sum(chars for chars, _ in self.samples)
+        total_tokens = sum(tokens for _, tokens in self.samples)
+        self.chars_per_token = total_chars / total_tokens
+        worst_error = max(
+            abs(chars / self.chars_per_token - tokens) / tokens for chars, tokens in self.samples
+        )
+        self.error_margin = max(MIN_ERROR_MARGIN, worst_error)
+
+    def record(self, text: str, tokens: int) -> None:
+        """Add a real token count for a piece of text and refit."""
+        if tokens <= 0:
+            return
+        with self._lock:
+            self.samples.append((len(text), tokens))
+            self.samples = self.samples[-MAX_SAMPLES:]
+            self._calibrate()
+            self._save()
+
+    def estimate(self, text: str) -> int:
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def bounds(self, text: str) -> Tuple[int, int]:
+        """Lower and upper bound on the real token count, given the calibration error."""
+        estimate = self.estimate(text)
+        return (
+            math.floor(estimate * (1 - self.error_margin)),
+            math.ceil(estimate * (1 + self.error_margin)),
+        )
+
+    def fits(self, text: str, limit: int, count_remote=None) -> bool:
+        """
+        Decide whether text fits in limit tokens. The remote counter is only called
+        when the limit falls inside the estimate's error bounds, and at most once.
+        """
+        lower, upper = self.bounds(text)
+        if upper <= limit:
+            return True
+        if lower > limit or count_remote is None:
+            return False
+        tokens = count_remote(text)
+        self.record(text, tokens)
+        return tokens <= limit
+
+
+estimator = TokenEstimator()
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the Claude token count of a string without a network round trip."""
+    return estimator.estimate(text)
+
+
+def upper_bound_tokens(text: str) -> int:
+    """A token count the real one should not exceed, for sizing chunks safely."""
+    return estimator.bounds(text)[1]
@@ -6,6 +6,10 @@ import anthropic
 import requests
 from urllib.parse import urlparse
 import time
+import re
+from concurrent.futures import ThreadPoolExecutor
+from services.token_estimator import estimator, upper_bound_tokens
+from services.summary_cache import SummaryCache
 
 # Load environment variables
 load_dotenv()
@@ -66,13 +70,80 @@ Please follow these steps to create your summary:
 Remember to base your summary solely on the information provided in the bill text and metadata. Do not include any external information or personal knowledge about the bill or its context."""
 
 
+def create_chunk_prompt(chunk_text, part_number, total_parts):
+    return f"""You are reading part {part_number} of {total_parts} of a long bill. Other parts are being summarized separately and your notes will be combined with theirs.
+
+<bill_text_part>
+{chunk_text}
+</bill_text_part>
+
+Write concise notes on this part only:
+- The main purpose and key provisions it contains, naming section numbers where possible
+- Any controversial, surprising or unusual elements, with specific figures, dates or affected groups
+- Anything that indicates who introduced the bill or which party supports it
+
+Use plain bullet points. Do not speculate about parts you have not seen. Do not include any external information or personal opinions."""
+
+
+def create_reduce_prompt(part_summaries, bill_metadata):
+    parts = "\n\n".join(
+        f"<part number=\"{i}\">\n{summary}\n</part>" for i, summary in enumerate(part_summaries, 1)
+    )
+    return f"""You are tasked with summarizing a bill based on notes about its text and its metadata. The bill was too long to read at once, so it was split into consecutive parts and each part was summarized separately. Your summary should consist of three paragraphs: a brief overview, shocking parts of the bill, and information about who introduced it.
+
+First, you will be provided with the notes for each part of the bill, in order:
+
+<bill_part_notes>
+{parts}
+</bill_part_notes>
+
+Next, you will be given metadata about the bill, including its sponsors and party affiliations:
+
+<bill_metadata>
+{bill_metadata}
+</bill_metadata>
+
+Combine the notes into a single summary of the whole bill, in three paragraphs:
+
+   Paragraph 1: Brief Overview | 1-2 sentences
+   - Summarize the main purpose and key provisions of the bill as a whole
+
+   Paragraph 2: Shocking or Controversial Elements | 5-10 sentences
+   - Highlight the most surprising, controversial, or unusual elements from across all parts
+   - If there are no shocking elements, discuss the most significant or impactful provision
+   - Present these in bullet points
+
+   Paragraph 3: Bill Introduction and Partisanship | 1-3 setences
+   - Provide information on who introduced the bill
+   - Indicate whether the bill is Democratic, Republican, or bipartisan based on its sponsors
+
+Format your response using XML:
+   <summary>
+       <overview></overview>
+       <shocking_elements></shocking_elements>
+       <introduction_and_partisanship></introduction_and_partisanship>
+   </summary>
+
+Use objective language, ensure each section is properly enclosed within its respective XML tags, and base your summary solely on the notes and metadata provided."""
+
+
 # Initialize clients
 client_openai = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 client_anthropic = anthropic.Client(api_key=os.getenv('ANTHROPIC_API_KEY'))
+summary_cache = SummaryCache()
 
-def summarize_text(text, vote_info):
-    # Format the metadata from vote_info into a text summary
-    metadata = f"""
+MODEL = "claude-3-5-sonnet-20241022"
+
+# Prompts above this size are summarized in chunks instead of in one request
+CONTEXT_TOKEN_LIMIT = 180000
+CHUNK_TOKEN_BUDGET = 60000
+MAX_CONCURRENT_CHUNKS = 4
+
+SECTION_BOUNDARY = re.compile(r"(?=^\s*(?:SEC\.|SECTION)\s+\d+[A-Za-z]?\.)", re.MULTILINE)
+
+
+def format_vote_metadata(vote_info):
+    return f"""
     Senate Roll Call Vote Summary:
     Total Yeas: {vote_info['vote_summary'].get('total_yeas', 0)}
     Total Nays: {vote_info['vote_summary'].get('total_nays', 0)}
@@ -85,21 +156,119 @@ def summarize_text(text, vote_info):
     Nays: {', '.join(f"{senator['name']} ({senator['party_state']})" for senator in vote_info['nays'])}
     Not Voting: {', '.join(f"{senator['name']} ({senator['party_state']})" for senator in vote_info['not_voting'])}
     """
-    
-    prompt = create_prompt(text, metadata)
 
-    print("PROMPT: ", prompt)
 
-    # Updated Anthropic API call
-    message = client_anthropic.messages.create(
-        model="claude-3-5-sonnet-20241022",
+def split_oversized(text, token_budget):
+    """Split a single section that is over budget on paragraph breaks, then hard-wrap what is left."""
+    pieces = []
+    current = ""
+    for paragraph in re.split(r"(?<=\n\n)", text):
+        if current and upper_bound_tokens(current + paragraph) > token_budget:
+            pieces.append(current)
+            current = ""
+        current += paragraph
+    if current:
+        pieces.append(current)
+
+    max_chars = max(1, len(text) * token_budget // max(1, upper_bound_tokens(text)))
+    return [piece[i:i + max_chars] for piece in pieces for i in range(0, len(piece), max_chars)]
+
+
+def split_bill_into_chunks(bill_text, token_budget=CHUNK_TOKEN_BUDGET):
+    """
+    Split bill text on section boundaries ("SEC. 2.", "SECTION 1.") into chunks
+    that each fit in token_budget. Nothing is dropped; chunks are in bill order.
+    """
+    chunks = []
+    current = ""
+    for section in SECTION_BOUNDARY.split(bill_text):
+        if not section:
+            continue
+        if upper_bound_tokens(section) > token_budget:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(split_oversized(section, token_budget))
+            continue
+        if current and upper_bound_tokens(current + section) > token_budget:
+            chunks.append(current)
+            current = ""
+        current += section
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def count_prompt_tokens(prompt):
+    """Exact token count for a prompt, one round trip. Only used to confirm borderline prompts."""
+    response = client_anthropic.beta.messages.count_tokens(
+        betas=["token-counting-2024-11-01"],
+        model=MODEL,
+        messages=[{
+            "role": "user",
+            "content": prompt
+        }],
+    )
+    return response.input_tokens
+
+
+def create_message(prompt):
+    return client_anthropic.messages.create(
+        model=MODEL,
         max_tokens=2048,
         messages=[
             {"role": "user", "content": prompt}
         ]
     )
 
-    return message.content
+
+def summarize_chunks(text, metadata):
+    """Map-reduce: summarize each chunk concurrently, then combine the notes into one <summary>."""
+    chunks = split_bill_into_chunks(text)
+    print(f"Bill is too long for one request, summarizing {len(chunks)} chunks.")
+
+    def summarize_chunk(numbered_chunk):
+        part_number, chunk = numbered_chunk
+        message = create_message(create_chunk_prompt(chunk, part_number, len(chunks)))
+        return message.content[0].text
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_CHUNKS) as executor:
+        part_summaries = list(executor.map(summarize_chunk, enumerate(chunks, 1)))
+
+    return create_message(create_reduce_prompt(part_summaries, metadata)).content[0].text
+
+
+def is_complete_summary(summary):
+    """Whether a model reply has the <summary> sections main() reads, parsed the same way."""
+    soup = BeautifulSoup(summary, 'xml')
+    return soup.find('summary') is not None and soup.find('overview') is not None
+
+
+def summarize_text(text, vote_info):
+    # Format the metadata from vote_info into a text summary
+    metadata = format_vote_metadata(vote_info)
+    
+    prompt = create_prompt(text, metadata)
+
+    # The prompt includes the template, bill text and vote metadata
+    cache_key = SummaryCache.make_key(MODEL, prompt)
+    cached_summary = summary_cache.get(cache_key)
+    if cached_summary is not None and is_complete_summary(cached_summary):
+        return cached_summary
+
+    if not estimator.fits(prompt, CONTEXT_TOKEN_LIMIT, count_remote=count_prompt_tokens):
+        summary = summarize_chunks(text, metadata)
+    else:
+        print("PROMPT: ", prompt)
+
+        # Updated Anthropic API call
+        message = create_message(prompt)
+        summary = message.content[0].text
+
+    # Only cache replies that parse, so a bad reply is retried next run
+    if is_complete_summary(summary):
+        summary_cache.set(cache_key, summary)
+    return summary
 
 def parse_bill_info(html_file, vote_info=None):
     print("Starting parse_bill_info...")  # Debugging print
@@ -205,7 +374,7 @@ def parse_senate_vote(html_file):
     return vote_info
 
 def scrape_congress_bill(url):
-    """Scrape bill information from congress.gov and ensure it is within token limits."""
+    """Scrape bill information from congress.gov."""
     try:
         # Enhanced headers to look more like a real browser
         headers = {
@@ -250,35 +419,7 @@ def scrape_congress_bill(url):
                 bill_text = summary_elem.get_text(separator='\n', strip=True)
                 bill_info['content'] = bill_text
 
-        # Check token count and trim if necessary
-        while True:
-            response = client_anthropic.beta.messages.count_tokens(
-                betas=["token-counting-2024-11-01"],
-                model="claude-3-5-sonnet-20241022",
-                system="You are a scientist",
-                messages=[{
-                    "role": "user",
-                    "content": bill_info['content']
-                }],
-            )
-            
-            # Debug print to understand the response structure
-            print("Token count response:", response)
-            
-            # Assuming response is an object, not a dictionary
-            token_count = response.input_tokens  # Adjust this line based on the actual response structure
-            
-            if token_count <= 180000:
-                break
-            # Calculate the number of tokens over the limit
-            tokens_over_limit = token_count - 180000
-            
-            # Calculate the number of characters to trim
-            trim_length = tokens_over_limit * 4  # CHAR_TOKEN_RATIO is 3
-            
-            # Trim the content by the calculated length
-            bill_info['content'] = bill_info['content'][:-trim_length]
-
+        # Oversized bills are chunked by summarize_text, so keep the full content here
         return f"CONTENT: {bill_info['content']}"
     except Exception as e:
         raise RuntimeError(f"Error scraping congress.gov: {str(e)}")
@@ -0,0 +1,110 @@
+"""
+Incrementally sync CongressMembers and Legislation with Congress.gov.
+
+Only records updated since the last sync's high-water mark are requested, and
+of those only rows whose fingerprint changed are upserted:
+
+    python sync.py --members --bills --congress 118 --type s
+"""
+import argparse
+import os
+from dotenv import load_dotenv
+from services.congress_api import CongressAPI
+from services.database import DatabaseService
+from services.sync_state import SyncState, normalize_update_date
+
+# Load environment variables from .env file
+load_dotenv()
+
+SYNC_STATE_DIR = os.getenv('SYNC_STATE_DIR', '.cache/sync')
+
+
+def sync_rows(rows, state, store, batch_size):
+    """
+    rows yields (row_id, row, update_date). Changed rows are stored in batches of
+    batch_size; fingerprints are saved after every stored batch and the high-water
+    mark only advances once everything has been stored.
+    """
+    fetched = 0
+    changed = 0
+    batch = []
+    newest = None
+
+    def flush():
+        nonlocal batch, changed
+        if not batch:
+            return
+        if not store([row for _, row, _ in batch]):
+            raise RuntimeError("Storing a batch failed. The high-water mark was not advanced; rerun to retry.")
+        for row_id, _, fingerprint in batch:
+            state.fingerprints[row_id] = fingerprint
+        changed += len(batch)
+        batch = []
+        state.save()
+
+    for row_id, row, update_date in rows:
+        fetched += 1
+        update_date = normalize_update_date(update_date)
+        if update_date and (newest is None or update_date > newest):
+            newest = update_date
+        fingerprint = state.fingerprint(row)
+        if state.is_unchanged(row_id, fingerprint):
+            continue
+        batch.append((row_id, row, fingerprint))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    state.advance(newest)
+    state.save()
+    print(f"Fetched {fetched} updated records, upserted {changed} changed rows. High-water mark: {state.high_water_mark}")
+    return fetched, changed
+
+
+def sync_members(api, db, batch_size, full=False):
+    state = SyncState(os.path.join(SYNC_STATE_DIR, 'members.json'))
+    since = None if full else state.high_water_mark
+    rows = (
+        (member.bioguideId, db.prepare_member_data(member), member.updateDate)
+        for member in api.iter_members(updated_since=since)
+    )
+    return sync_rows(rows, state, db.store_members, batch_size)
+
+
+def sync_bills(api, db, congress, bill_type, batch_size, full=False):
+    state = SyncState(os.path.join(SYNC_STATE_DIR, f"bills-{congress}-{bill_type.lower()}.json"))
+    since = None if full else state.high_water_mark
+    rows = (
+        (f"{bill.congress}-{bill.type}-{bill.number}".lower(), db.prepare_bill_data(bill), bill.updateDate)
+        for bill in api.iter_bills(congress, bill_type, updated_since=since)
+    )
+    return sync_rows(rows, state, db.store_legislation, batch_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally sync members and legislation from Congress.gov")
+    parser.add_argument("--members", action="store_true", help="sync the CongressMembers table")
+    parser.add_argument("--bills", action="store_true", help="sync the Legislation table")
+    parser.add_argument("--congress", type=int, default=118)
+    parser.add_argument("--type", dest="bill_type", default="s", help="bill type, e.g. hr, s, hjres")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--full", action="store_true", help="ignore the high-water mark and re-diff everything")
+    args = parser.parse_args()
+
+    api_key = os.getenv('CONGRESS_API_KEY')
+    if not api_key:
+        raise ValueError("API key not found. Please set the API_KEY environment variable.")
+
+    api = CongressAPI(api_key)
+    db = DatabaseService()
+
+    if args.members:
+        sync_members(api, db, args.batch_size, args.full)
+    if args.bills:
+        sync_bills(api, db, args.congress, args.bill_type, args.batch_size, args.full)
+    if not (args.members or args.bills):
+        parser.error("nothing to sync, pass --members and/or --bills")
+
+
+if __name__ == "__main__":
+    main()
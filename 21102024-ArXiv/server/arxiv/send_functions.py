@@ -1,17 +1,102 @@
+import asyncio
 import feedparser
-from datetime import datetime, timedelta
-from dataclasses import dataclass
-from typing import Optional, List
+import hashlib
+import httpx
+import json
+import random
+import re
+import requests
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Dict, Iterable, Iterator, Optional, List, Set, Tuple
 from supabase import create_client, Client
 from dotenv import load_dotenv
 from mendeley import Mendeley
 import os
 import logging
-from rcs import Pinnacle, Card, Action
+from rcs import Pinnacle, PinnacleEnvironment, Card, Action
+from rcs.core.api_error import ApiError
+from rcs.core.jsonable_encoder import jsonable_encoder
 
 load_dotenv()
 
-client = Pinnacle(api_key=os.environ["PINNACLE_API_KEY"])
+# Local state files (outbox, caches, indexes) live in the server directory rather
+# than wherever the process was started from, unless a path is configured
+STATE_DIR = os.getenv("STATE_DIR", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# State the cron job must carry from one run to the next is kept in Supabase,
+# because each run starts in a fresh container. "local" keeps it in files under
+# STATE_DIR instead, which only persists if STATE_DIR is on a persistent volume.
+STATE_BACKEND = os.getenv("STATE_BACKEND", "supabase")
+
+# Unset means the SDK's default environment; point it at a fake server for local testing
+PINNACLE_BASE_URL = os.getenv("PINNACLE_BASE_URL") or None
+
+client = Pinnacle(api_key=os.environ["PINNACLE_API_KEY"], base_url=PINNACLE_BASE_URL)
+
+# Digest delivery tuning, matched to the Pinnacle send rate limit
+SEND_RATE_PER_SECOND = float(os.getenv("SEND_RATE_PER_SECOND", 10))
+SEND_BURST = int(os.getenv("SEND_BURST", 10))
+SEND_CONCURRENCY = int(os.getenv("SEND_CONCURRENCY", 20))
+SEND_MAX_RETRIES = int(os.getenv("SEND_MAX_RETRIES", 3))
+SEND_BACKOFF_SECONDS = float(os.getenv("SEND_BACKOFF_SECONDS", 0.5))
+SEND_TIMEOUT_SECONDS = float(os.getenv("SEND_TIMEOUT_SECONDS", 30))
+# Durable (digest_id, phone) send jobs, so interrupted digest runs resume without resending
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", os.path.join(STATE_DIR, "outbox.sqlite"))
+DIGESTS_TABLE = "ArxivDigests"
+DIGEST_JOBS_TABLE = "ArxivDigestJobs"
+# Upper edges of the delivery latency histogram buckets
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500)
+
+# Mendeley enrichment tuning
+MENDELEY_MAX_WORKERS = int(os.getenv("MENDELEY_MAX_WORKERS", 8))
+MENDELEY_MAX_RETRIES = int(os.getenv("MENDELEY_MAX_RETRIES", 3))
+MENDELEY_BACKOFF_SECONDS = float(os.getenv("MENDELEY_BACKOFF_SECONDS", 1.0))
+
+# DOI -> reader count cache
+READER_COUNT_CACHE_PATH = os.getenv(
+    "READER_COUNT_CACHE_PATH", os.path.join(STATE_DIR, "reader_counts.sqlite")
+)
+READER_COUNT_TTL_HOURS = float(os.getenv("READER_COUNT_TTL_HOURS", 24))
+READER_COUNT_CACHE_SIZE = int(os.getenv("READER_COUNT_CACHE_SIZE", 10000))
+# Stored papers from this many of the most recent days get their views refreshed each run
+VIEWS_REFRESH_DAYS = int(os.getenv("VIEWS_REFRESH_DAYS", 3))
+
+# Papers handed to each enrichment / insert call by the ingestion pipeline
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", 100))
+
+# arXiv category feeds fetched on every run
+ARXIV_CATEGORIES = [
+    category.strip()
+    for category in os.getenv("ARXIV_CATEGORIES", "cs.AI,cs.LG,cs.CL").split(",")
+    if category.strip()
+]
+FEED_BASE_URL = os.getenv("FEED_BASE_URL", "https://rss.arxiv.org/atom")
+FEED_STATE_PATH = os.getenv("FEED_STATE_PATH", os.path.join(STATE_DIR, "feed_state.json"))
+FEED_STATE_TABLE = "ArxivFeedState"
+FEED_TIMEOUT_SECONDS = float(os.getenv("FEED_TIMEOUT_SECONDS", 30))
+FEED_PARSE_WORKERS = int(os.getenv("FEED_PARSE_WORKERS", os.cpu_count() or 1))
+
+# Top papers of the latest day are cached in-process. Ingest runs in the cron job,
+# not in rcs_server, so after new papers land the server serves the previous list
+# for at most this TTL
+POPULAR_PAPERS_TTL_SECONDS = float(os.getenv("POPULAR_PAPERS_TTL_SECONDS", 300))
+POPULAR_PAPERS_CACHE_SIZE = int(os.getenv("POPULAR_PAPERS_CACHE_SIZE", 10))
+# Papers looked up by arxiv_id for "Summarize" taps. Rows are only ever inserted,
+# so a cached paper cannot go stale
+PAPER_CACHE_SIZE = int(os.getenv("PAPER_CACHE_SIZE", 1000))
+PAPER_CACHE_TTL_SECONDS = float(os.getenv("PAPER_CACHE_TTL_SECONDS", 3600))
+
+# Local index of arxiv_ids already stored in Supabase
+PAPER_ID_INDEX_PATH = os.getenv("PAPER_ID_INDEX_PATH", os.path.join(STATE_DIR, "paper_ids.txt"))
+# Supabase returns at most this many rows per request
+SUPABASE_PAGE_SIZE = 1000
 
 
 @dataclass
@@ -39,7 +124,29 @@ class ArxivSubscriber:
     is_subscribed: bool
 
 
-def sendPapers(to: str, papers: List[ArxivPaper]):
+@dataclass
+class IngestStats:
+    """Counters for each stage of the ingestion pipeline."""
+
+    parsed: int = 0
+    too_old: int = 0
+    unchanged_feeds: int = 0
+    cross_listed: int = 0
+    duplicates: int = 0
+    new: int = 0
+    enriched: int = 0
+    saved: int = 0
+
+    def report(self) -> str:
+        return (
+            f"{self.unchanged_feeds} feeds unchanged, "
+            f"parsed {self.parsed} papers from RSS ({self.cross_listed} cross-listed, {self.too_old} too old), "
+            f"{self.duplicates} already known, {self.new} new, "
+            f"{self.enriched} enriched, {self.saved} saved"
+        )
+
+
+def build_paper_message(papers: List[ArxivPaper]) -> Tuple[List[Card], List[Action]]:
     cards = []
     for paper in papers:
         card = Card(
@@ -70,6 +177,11 @@ def sendPapers(to: str, papers: List[ArxivPaper]):
         ),
         Action(title="Opt out", payload="OPT_OUT", type="trigger"),
     ]
+    return cards, quick_replies
+
+
+def sendPapers(to: str, papers: List[ArxivPaper]):
+    cards, quick_replies = build_paper_message(papers)
 
     try:
         res = client.send.rcs(
@@ -91,6 +203,472 @@ def sendPapers(to: str, papers: List[ArxivPaper]):
         print(f"Failed to send papers to {to}: {str(e)}")
 
 
+@dataclass
+class DeliveryResult:
+    sent: int = 0
+    failed: Dict[str, str] = field(default_factory=dict)
+    latencies: List[float] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def histogram(self) -> str:
+        counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        for latency in self.latencies:
+            bucket = next(
+                (
+                    index
+                    for index, edge in enumerate(LATENCY_BUCKETS_MS)
+                    if latency * 1000 < edge
+                ),
+                len(LATENCY_BUCKETS_MS),
+            )
+            counts[bucket] += 1
+        labels = [f"<{edge}ms" for edge in LATENCY_BUCKETS_MS] + [
+            f">={LATENCY_BUCKETS_MS[-1]}ms"
+        ]
+        return " ".join(f"{label}: {count}" for label, count in zip(labels, counts))
+
+    def report(self) -> str:
+        total = self.sent + len(self.failed)
+        return (
+            f"Delivered {self.sent}/{total} digests in {self.elapsed:.1f}s "
+            f"({self.sent / max(self.elapsed, 1e-9):.1f}/s), {len(self.failed)} failed; "
+            f"latency p50 {percentile(self.latencies, 50) * 1000:.0f}ms "
+            f"p99 {percentile(self.latencies, 99) * 1000:.0f}ms [{self.histogram()}]"
+        )
+
+
+class AsyncTokenBucket:
+    """Token bucket shared by the delivery tasks of one event loop."""
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst,
+                self._tokens + (now - self._last_refill) * self.rate_per_second,
+            )
+            self._last_refill = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate_per_second)
+
+
+def is_retryable_send_error(error: Exception) -> bool:
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, ApiError):
+        return error.status_code is None or error.status_code >= 500 or error.status_code in (408, 409, 429)
+    return False
+
+
+class DigestTemplate:
+    """
+    The /send/rcs request for one digest, serialized once.
+
+    Every subscriber gets the same cards and quick replies, so the body is encoded
+    up front with the SDK's own encoder and render() only splices the recipient
+    into the pre-encoded bytes. No Card/Action objects are built or validated per send.
+    payload holds the encoded cards and quick replies, which is what the outbox stores.
+    """
+
+    def __init__(self, payload: bytes, from_: str = "test"):
+        self.payload = payload
+        self.url = f"{PINNACLE_BASE_URL or PinnacleEnvironment.DEFAULT.value}/send/rcs"
+        self.headers = {
+            "PINNACLE-API-Key": os.environ["PINNACLE_API_KEY"],
+            "Content-Type": "application/json",
+            "ROCKET-RACCOON-FLOW-CHANGE": "arxiv",
+        }
+        self._prefix = b'{"from":' + json.dumps(from_).encode() + b',"to":'
+
+    @classmethod
+    def from_papers(cls, papers: List[ArxivPaper], from_: str = "test") -> "DigestTemplate":
+        cards, quick_replies = build_paper_message(papers)
+        payload = (
+            b',"cards":'
+            + json.dumps(jsonable_encoder(cards), separators=(",", ":")).encode()
+            + b',"quickReplies":'
+            + json.dumps(jsonable_encoder(quick_replies), separators=(",", ":")).encode()
+            + b"}"
+        )
+        return cls(payload, from_)
+
+    def render(self, to: str) -> bytes:
+        return self._prefix + json.dumps(to).encode() + self.payload
+
+
+def make_digest_id(papers: List[ArxivPaper]) -> str:
+    """Same papers on the same (UTC) day give the same digest, so a rerun resumes it."""
+    digest = hashlib.sha256(datetime.now(timezone.utc).date().isoformat().encode())
+    for paper in papers:
+        digest.update(b"\0" + paper.arxiv_id.encode())
+    return digest.hexdigest()[:16]
+
+
+class DigestOutbox:
+    """
+    Durable queue of (digest_id, phone) send jobs in SQLite (WAL mode).
+
+    Jobs go pending -> sending -> sent, or failed on a permanent error. Anything
+    still pending or sending after a crash is picked up again by the next run,
+    while sent jobs are never sent again.
+
+    Delivery is at-least-once. A job interrupted after its request reached the
+    API, but before it was marked sent, is sent again, and that subscriber gets
+    the digest twice. Each job's Idempotency-Key header stays the same across
+    retries, but the Pinnacle API does not document that header, so nothing
+    relies on it being honoured.
+    """
+
+    def __init__(self, path: str = OUTBOX_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS digests ("
+            " digest_id TEXT PRIMARY KEY,"
+            " payload BLOB NOT NULL,"
+            " created_at TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " digest_id TEXT NOT NULL,"
+            " phone TEXT NOT NULL,"
+            " idempotency_key TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'pending',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " last_error TEXT,"
+            " updated_at TEXT NOT NULL,"
+            " PRIMARY KEY (digest_id, phone))"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def idempotency_key(digest_id: str, phone: str) -> str:
+        return hashlib.sha256(f"{digest_id}:{phone}".encode()).hexdigest()[:32]
+
+    def enqueue(self, digest_id: str, template: DigestTemplate, recipients: List[str]):
+        """Record a digest and its jobs; recipients already queued for it are left alone."""
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO digests (digest_id, payload, created_at) VALUES (?, ?, ?)",
+                (digest_id, template.payload, now),
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO jobs (digest_id, phone, idempotency_key, updated_at) VALUES (?, ?, ?, ?)",
+                [
+                    (digest_id, phone, self.idempotency_key(digest_id, phone), now)
+                    for phone in recipients
+                ],
+            )
+            self._conn.commit()
+
+    def template(self, digest_id: str) -> DigestTemplate:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM digests WHERE digest_id = ?", (digest_id,)
+            ).fetchone()
+        return DigestTemplate(bytes(row[0]))
+
+    def unsent(self, digest_id: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT phone FROM jobs WHERE digest_id = ? AND status IN ('pending', 'sending')",
+                (digest_id,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def unfinished_digests(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT digest_id FROM jobs WHERE status IN ('pending', 'sending')"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def mark(self, digest_id: str, phone: str, status: str, error: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + ?, last_error = ?, updated_at = ?"
+                " WHERE digest_id = ? AND phone = ?",
+                (
+                    status,
+                    1 if status == "sending" else 0,
+                    error,
+                    datetime.now().isoformat(),
+                    digest_id,
+                    phone,
+                ),
+            )
+            self._conn.commit()
+
+    def counts(self, digest_id: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE digest_id = ? GROUP BY status",
+                (digest_id,),
+            ).fetchall()
+        return dict(rows)
+
+
+class SupabaseDigestOutbox(DigestOutbox):
+    """
+    DigestOutbox kept in the ArxivDigests and ArxivDigestJobs tables, so a digest
+    interrupted in one cron container is resumed by the next run's container.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Attempts per job as last read or written, since PostgREST cannot increment
+        self._attempts: Dict[Tuple[str, str], int] = {}
+
+    def enqueue(self, digest_id: str, template: DigestTemplate, recipients: List[str]):
+        now = datetime.now(timezone.utc).isoformat()
+        supabase.table(DIGESTS_TABLE).upsert(
+            {"digest_id": digest_id, "payload": template.payload.decode(), "created_at": now},
+            on_conflict="digest_id",
+            ignore_duplicates=True,
+        ).execute()
+        for batch in batched(recipients, SUPABASE_PAGE_SIZE):
+            supabase.table(DIGEST_JOBS_TABLE).upsert(
+                [
+                    {
+                        "digest_id": digest_id,
+                        "phone": phone,
+                        "idempotency_key": self.idempotency_key(digest_id, phone),
+                        "updated_at": now,
+                    }
+                    for phone in batch
+                ],
+                on_conflict="digest_id,phone",
+                ignore_duplicates=True,
+            ).execute()
+
+    def template(self, digest_id: str) -> DigestTemplate:
+        result = (
+            supabase.table(DIGESTS_TABLE)
+            .select("payload")
+            .eq("digest_id", digest_id)
+            .execute()
+        )
+        return DigestTemplate(result.data[0]["payload"].encode())
+
+    def unsent(self, digest_id: str) -> List[str]:
+        rows = select_all_rows(
+            lambda: supabase.table(DIGEST_JOBS_TABLE)
+            .select("phone, attempts")
+            .eq("digest_id", digest_id)
+            .in_("status", ["pending", "sending"])
+            .order("phone")
+        )
+        with self._lock:
+            for row in rows:
+                self._attempts[(digest_id, row["phone"])] = row["attempts"]
+        return [row["phone"] for row in rows]
+
+    def unfinished_digests(self) -> List[str]:
+        rows = select_all_rows(
+            lambda: supabase.table(DIGEST_JOBS_TABLE)
+            .select("digest_id, phone")
+            .in_("status", ["pending", "sending"])
+            .order("digest_id")
+            .order("phone")
+        )
+        return list(dict.fromkeys(row["digest_id"] for row in rows))
+
+    def mark(self, digest_id: str, phone: str, status: str, error: Optional[str] = None):
+        with self._lock:
+            attempts = self._attempts.get((digest_id, phone), 0) + (1 if status == "sending" else 0)
+            self._attempts[(digest_id, phone)] = attempts
+        supabase.table(DIGEST_JOBS_TABLE).update(
+            {
+                "status": status,
+                "attempts": attempts,
+                "last_error": error,
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            }
+        ).eq("digest_id", digest_id).eq("phone", phone).execute()
+
+    def counts(self, digest_id: str) -> Dict[str, int]:
+        rows = select_all_rows(
+            lambda: supabase.table(DIGEST_JOBS_TABLE)
+            .select("phone, status")
+            .eq("digest_id", digest_id)
+            .order("phone")
+        )
+        counts: Dict[str, int] = {}
+        for row in rows:
+            counts[row["status"]] = counts.get(row["status"], 0) + 1
+        return counts
+
+
+_digest_outbox: Optional[DigestOutbox] = None
+_digest_outbox_lock = threading.Lock()
+
+
+def get_digest_outbox() -> DigestOutbox:
+    """
+    The shared outbox, opened on first use so importing this module creates no
+    files: Supabase tables by default, a SQLite file with STATE_BACKEND=local.
+    """
+    global _digest_outbox
+    with _digest_outbox_lock:
+        if _digest_outbox is None:
+            if STATE_BACKEND == "local":
+                _digest_outbox = DigestOutbox()
+            else:
+                _digest_outbox = SupabaseDigestOutbox()
+        return _digest_outbox
+
+
+async def mark_job(outbox: DigestOutbox, digest_id: str, to: str, status: str, error: Optional[str] = None):
+    """
+    Record a job's status off the event loop. A failed write is logged rather
+    than raised, so it can never make a delivered message look failed and be
+    sent again within this run; the job just keeps its previous status.
+    """
+    try:
+        await asyncio.to_thread(outbox.mark, digest_id, to, status, error)
+    except Exception as e:
+        logging.error(f"Failed to mark {to} {status} in digest {digest_id}: {str(e)}")
+        print(f"Failed to mark {to} {status} in digest {digest_id}: {str(e)}")
+
+
+async def send_digest_with_retry(
+    http_client: httpx.AsyncClient,
+    to: str,
+    template: DigestTemplate,
+    rate_limiter: AsyncTokenBucket,
+    result: DeliveryResult,
+    outbox: Optional[DigestOutbox] = None,
+    digest_id: Optional[str] = None,
+):
+    """
+    Send one digest, retrying transient failures with jittered backoff. A
+    request that times out may still have been delivered, so a retry can
+    deliver it twice: sends are at-least-once.
+    """
+    body = template.render(to)
+    headers = template.headers
+    if outbox is not None:
+        headers = {**headers, "Idempotency-Key": outbox.idempotency_key(digest_id, to)}
+    start = time.perf_counter()
+    for attempt in range(SEND_MAX_RETRIES + 1):
+        await rate_limiter.acquire()
+        try:
+            if outbox is not None:
+                await mark_job(outbox, digest_id, to, "sending")
+            response = await http_client.post(template.url, content=body, headers=headers)
+            if not 200 <= response.status_code < 300:
+                raise ApiError(status_code=response.status_code, body=response.text)
+            if outbox is not None:
+                await mark_job(outbox, digest_id, to, "sent")
+            result.sent += 1
+            result.latencies.append(time.perf_counter() - start)
+            return
+        except Exception as e:
+            retryable = is_retryable_send_error(e)
+            if attempt == SEND_MAX_RETRIES or not retryable:
+                logging.error(f"Failed to send papers to {to}: {str(e)}")
+                print(f"Failed to send papers to {to}: {str(e)}")
+                result.failed[to] = str(e)
+                if outbox is not None:
+                    # Transient failures stay queued for the next run
+                    await mark_job(outbox, digest_id, to, "pending" if retryable else "failed", str(e))
+                return
+            await asyncio.sleep(SEND_BACKOFF_SECONDS * 2**attempt * (0.5 + random.random()))
+
+
+async def deliver_digest_async(
+    template: DigestTemplate,
+    recipients: List[str],
+    outbox: Optional[DigestOutbox] = None,
+    digest_id: Optional[str] = None,
+    concurrency: int = SEND_CONCURRENCY,
+    rate_per_second: float = SEND_RATE_PER_SECOND,
+    burst: int = SEND_BURST,
+) -> DeliveryResult:
+    result = DeliveryResult()
+    if not recipients:
+        return result
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for to in recipients:
+        queue.put_nowait(to)
+    rate_limiter = AsyncTokenBucket(rate_per_second, burst)
+
+    start = time.perf_counter()
+    async with httpx.AsyncClient(
+        timeout=SEND_TIMEOUT_SECONDS,
+        limits=httpx.Limits(max_connections=concurrency),
+    ) as http_client:
+
+        async def worker():
+            while not queue.empty():
+                to = queue.get_nowait()
+                await send_digest_with_retry(
+                    http_client, to, template, rate_limiter, result, outbox, digest_id
+                )
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(recipients)))))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def deliver_papers(recipients: List[str], papers: List[ArxivPaper], **kwargs) -> DeliveryResult:
+    """
+    Send the same papers to every recipient from a pool of async workers, paced by
+    a token bucket and retrying transient failures per recipient with jittered
+    backoff. Logs and returns a summary of sent/failed counts and send latency.
+    """
+    template = DigestTemplate.from_papers(papers)
+    result = asyncio.run(deliver_digest_async(template, recipients, **kwargs))
+    logging.info(result.report())
+    print(result.report())
+    return result
+
+
+def deliver_digest(digest_id: str, outbox: Optional[DigestOutbox] = None, **kwargs) -> DeliveryResult:
+    """Send every job of a digest that is not sent yet, recording progress in the outbox."""
+    outbox = outbox or get_digest_outbox()
+    result = asyncio.run(
+        deliver_digest_async(
+            outbox.template(digest_id),
+            outbox.unsent(digest_id),
+            outbox=outbox,
+            digest_id=digest_id,
+            **kwargs,
+        )
+    )
+    logging.info(f"Digest {digest_id}: {result.report()} {outbox.counts(digest_id)}")
+    print(f"Digest {digest_id}: {result.report()} {outbox.counts(digest_id)}")
+    return result
+
+
+def send_digest(recipients: List[str], papers: List[ArxivPaper], outbox: Optional[DigestOutbox] = None) -> DeliveryResult:
+    """Queue a digest for every recipient in the outbox, then deliver it."""
+    outbox = outbox or get_digest_outbox()
+    digest_id = make_digest_id(papers)
+    outbox.enqueue(digest_id, DigestTemplate.from_papers(papers), recipients)
+    return deliver_digest(digest_id, outbox)
+
+
+def resume_unfinished_digests(outbox: Optional[DigestOutbox] = None):
+    outbox = outbox or get_digest_outbox()
+    for digest_id in outbox.unfinished_digests():
+        print(f"Resuming unfinished digest {digest_id}")
+        logging.info(f"Resuming unfinished digest {digest_id}")
+        deliver_digest(digest_id, outbox)
+
+
 def sendAboutProject(to: str):
     quick_replies: List[Action] = [
         Action(title="See Popular Papers", payload="SEE_MORE", type="trigger"),
@@ -162,6 +740,39 @@ supabase_key = os.environ["SUPABASE_KEY"]
 supabase: Client = create_client(supabase_url, supabase_key)
 
 
+_FRACTIONAL_SECONDS = re.compile(r"\.(\d+)")
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """
+    Parse a Supabase timestamp. Python 3.9's fromisoformat only accepts 3 or 6
+    fractional digits and no "Z", so the fraction is normalized to microseconds first.
+    """
+    value = value.replace("Z", "+00:00")
+    value = _FRACTIONAL_SECONDS.sub(
+        lambda match: "." + match.group(1)[:6].ljust(6, "0"), value, count=1
+    )
+    return datetime.fromisoformat(value)
+
+
+def _paper_from_row(row: dict) -> ArxivPaper:
+    return ArxivPaper(
+        arxiv_id=row["arxiv_id"],
+        title=row["title"],
+        updated=_parse_timestamp(row["updated"]),
+        abstract_link=row["abstract_link"],
+        summary=row["summary"],
+        categories=row["categories"],
+        published=_parse_timestamp(row["published"]),
+        announce_type=row["announce_type"],
+        rights=row["rights"],
+        journal_reference=row["journal_reference"],
+        doi=row["doi"],
+        creators=row["creators"],
+        views=row["views"],
+    )
+
+
 def get_most_recent_paper():
     result = (
         supabase.table("Arxiv")
@@ -171,63 +782,292 @@ def get_most_recent_paper():
         .execute()
     )
     if result.data:
-        updated_str = result.data[0]["updated"]
-        try:
-            # Try parsing the datetime string directly
-            return datetime.fromisoformat(updated_str)
-        except ValueError:
-            # If parsing fails, remove microseconds and try again
-            updated_str = updated_str.split(".")[0] + "+00:00"
-            return datetime.fromisoformat(updated_str)
+        return _parse_timestamp(result.data[0]["updated"])
     return None
 
 
-def get_arxiv_papers(category="cs.ai", since=None) -> List[ArxivPaper]:
-    """
-    Fetch arXiv papers from the current RSS feed for a given category.
+def paper_from_entry(entry) -> ArxivPaper:
+    return ArxivPaper(
+        arxiv_id=entry.id.split("/")[-1],
+        title=entry.title,
+        updated=datetime.fromisoformat(entry.updated.replace("Z", "+00:00")),
+        abstract_link=next(
+            link.href
+            for link in entry.links
+            if link.rel == "alternate" and link.type == "text/html"
+        ),
+        summary=entry.summary.replace("\n", " "),
+        categories=[tag["term"] for tag in entry.tags],
+        published=datetime.fromisoformat(entry.published.replace("Z", "+00:00")),
+        announce_type=entry.get("arxiv_announce_type", "N/A"),
+        rights=entry.get("rights", "N/A"),
+        journal_reference=entry.get("arxiv_journal_reference", None),
+        doi=entry.get("arxiv_doi", None),
+        creators=", ".join(author.name for author in entry.authors),
+        views=0,  # Filled in by the enrichment stage
+    )
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
 
-    :param category: arXiv category to fetch papers from (default: 'cs.ai')
-    :param since: datetime object to fetch papers updated after this time
-    :return: List of ArxivPaper objects
-    """
-    feed_url = f"https://rss.arxiv.org/atom/{category}"
 
-    feed = feedparser.parse(feed_url)
-    papers = []
+def parse_feed(
+    category="cs.ai", since=None, stats: Optional[IngestStats] = None
+) -> Iterator[ArxivPaper]:
+    """
+    Stage 1: yield papers from the arXiv RSS feed for a category, skipping
+    entries not updated after since.
+    """
+    stats = stats or IngestStats()
+    feed = feedparser.parse(f"{FEED_BASE_URL}/{category}")
 
     for entry in feed.entries:
-        updated = datetime.fromisoformat(entry.updated.replace("Z", "+00:00"))
-        if since and updated <= since:
+        stats.parsed += 1
+        paper = paper_from_entry(entry)
+        if since and paper.updated <= since:
+            stats.too_old += 1
             continue
+        yield paper
 
-        paper = ArxivPaper(
-            arxiv_id=entry.id.split("/")[-1],
-            title=entry.title,
-            updated=updated,
-            abstract_link=next(
-                link.href
-                for link in entry.links
-                if link.rel == "alternate" and link.type == "text/html"
-            ),
-            summary=entry.summary.replace("\n", " "),
-            categories=[tag["term"] for tag in entry.tags],
-            published=datetime.fromisoformat(entry.published.replace("Z", "+00:00")),
-            announce_type=entry.get("arxiv_announce_type", "N/A"),
-            rights=entry.get("rights", "N/A"),
-            journal_reference=entry.get("arxiv_journal_reference", None),
-            doi=entry.get("arxiv_doi", None),
-            creators=", ".join(author.name for author in entry.authors),
-            views=0,  # Initialize views to 0 for new papers
+
+def parse_feed_document(content: bytes) -> List[ArxivPaper]:
+    """Parse one downloaded Atom feed. Runs in a worker process, so it must stay module-level."""
+    return [paper_from_entry(entry) for entry in feedparser.parse(content).entries]
+
+
+class FeedFetcher:
+    """
+    Downloads arXiv category feeds concurrently with conditional GETs.
+
+    The ETag / Last-Modified of every feed is kept in the ArxivFeedState table
+    (or, given a path, a small JSON file), so an unchanged feed costs a single
+    304. New validators are only written by commit(), once the papers from that
+    download have been stored; a failed run therefore downloads the same feeds
+    again instead of skipping them. State is loaded on the first fetch.
+    """
+
+    def __init__(self, path: Optional[str] = None, timeout: float = FEED_TIMEOUT_SECONDS):
+        if path is None and STATE_BACKEND == "local":
+            path = FEED_STATE_PATH
+        self.path = path
+        self.timeout = timeout
+        self.state: Optional[Dict[str, dict]] = None
+        self._pending: Dict[str, dict] = {}
+
+    def _load(self) -> Dict[str, dict]:
+        if self.path is not None:
+            try:
+                with open(self.path, "r") as f:
+                    return json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                return {}
+        try:
+            result = supabase.table(FEED_STATE_TABLE).select("*").execute()
+        except Exception as e:
+            # Without validators every feed is simply downloaded in full
+            logging.error(f"Failed to load feed state: {str(e)}")
+            print(f"Failed to load feed state: {str(e)}")
+            return {}
+        return {
+            row["category"]: {"etag": row["etag"], "last_modified": row["last_modified"]}
+            for row in result.data
+        }
+
+    def fetch(self, category: str, session: requests.Session) -> Optional[bytes]:
+        """Return the feed body, or None if it has not changed since the last commit."""
+        if self.state is None:
+            self.state = self._load()
+        headers = {}
+        validators = self.state.get(category, {})
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        response = session.get(
+            f"{FEED_BASE_URL}/{category}", headers=headers, timeout=self.timeout
         )
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        self._pending[category] = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        return response.content
+
+    def fetch_all(self, categories: List[str]) -> Dict[str, Optional[bytes]]:
+        """Fetch every category at once; feeds that fail to download are left out."""
+        if self.state is None:
+            self.state = self._load()
+        documents = {}
+        with requests.Session() as session, ThreadPoolExecutor(
+            max_workers=max(1, len(categories))
+        ) as pool:
+            futures = {
+                category: pool.submit(self.fetch, category, session)
+                for category in categories
+            }
+            for category, future in futures.items():
+                try:
+                    documents[category] = future.result()
+                except requests.RequestException as e:
+                    logging.error(f"Failed to fetch {category} feed: {str(e)}")
+                    print(f"Failed to fetch {category} feed: {str(e)}")
+        return documents
+
+    def commit(self):
+        if not self._pending:
+            return
+        self.state.update(self._pending)
+        pending, self._pending = self._pending, {}
+        if self.path is None:
+            try:
+                supabase.table(FEED_STATE_TABLE).upsert(
+                    [{"category": category, **validators} for category, validators in pending.items()],
+                    on_conflict="category",
+                ).execute()
+            except Exception as e:
+                # The next run downloads these feeds in full again
+                logging.error(f"Failed to save feed state: {str(e)}")
+                print(f"Failed to save feed state: {str(e)}")
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+
+feed_fetcher = FeedFetcher()
+
+
+def parse_feeds(
+    categories: List[str] = ARXIV_CATEGORIES,
+    since=None,
+    stats: Optional[IngestStats] = None,
+    fetcher: Optional[FeedFetcher] = None,
+) -> Iterator[ArxivPaper]:
+    """
+    Stage 1 for several categories: download the feeds, parse the changed ones in
+    a process pool and yield every paper once, merging the categories of papers
+    cross-listed in more than one feed.
+    """
+    stats = stats or IngestStats()
+    fetcher = fetcher or feed_fetcher
+    documents = fetcher.fetch_all(categories)
+    changed = [content for content in documents.values() if content is not None]
+    stats.unchanged_feeds += len(documents) - len(changed)
+    if not changed:
+        return
+
+    if len(changed) == 1 or FEED_PARSE_WORKERS <= 1:
+        parsed = [parse_feed_document(content) for content in changed]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(len(changed), FEED_PARSE_WORKERS)
+        ) as pool:
+            parsed = list(pool.map(parse_feed_document, changed))
+
+    merged: Dict[str, ArxivPaper] = {}
+    for papers in parsed:
+        for paper in papers:
+            stats.parsed += 1
+            existing = merged.get(paper.arxiv_id)
+            if existing is None:
+                merged[paper.arxiv_id] = paper
+                continue
+            stats.cross_listed += 1
+            existing.categories += [
+                category
+                for category in paper.categories
+                if category not in existing.categories
+            ]
+
+    for paper in merged.values():
+        if since and paper.updated <= since:
+            stats.too_old += 1
+            continue
+        yield paper
 
-        paper.views = get_views(paper.doi) if paper.doi else 0
 
-        papers.append(paper)
+def dedupe_papers(
+    papers: Iterable[ArxivPaper],
+    known_ids: Optional[Set[str]] = None,
+    stats: Optional[IngestStats] = None,
+    batch_size: int = INGEST_BATCH_SIZE,
+) -> Iterator[ArxivPaper]:
+    """
+    Stage 2: drop papers that are already stored or were already seen in this run.
+    Without known_ids, each batch is checked against the paper ID index, which
+    confirms IDs it has not seen with one Supabase query per batch.
+    """
+    stats = stats or IngestStats()
+    seen = set()
+    for batch in batched(papers, batch_size):
+        batch_ids = [paper.arxiv_id for paper in batch]
+        if known_ids is None:
+            new_ids = get_paper_id_index().filter_new(batch_ids)
+        else:
+            new_ids = set(batch_ids) - known_ids
+        for paper in batch:
+            if paper.arxiv_id not in new_ids or paper.arxiv_id in seen:
+                stats.duplicates += 1
+                continue
+            seen.add(paper.arxiv_id)
+            stats.new += 1
+            yield paper
+
+
+def enrich_stage(
+    papers: Iterable[ArxivPaper],
+    stats: Optional[IngestStats] = None,
+    batch_size: int = INGEST_BATCH_SIZE,
+) -> Iterator[ArxivPaper]:
+    """Stage 3: fill in reader counts, one pooled batch of papers at a time."""
+    stats = stats or IngestStats()
+    for batch in batched(papers, batch_size):
+        enrich_papers(batch)
+        stats.enriched += len(batch)
+        yield from batch
+
+
+def persist_papers(
+    papers: Iterable[ArxivPaper],
+    stats: Optional[IngestStats] = None,
+    batch_size: int = INGEST_BATCH_SIZE,
+) -> int:
+    """Stage 4: insert papers in batches; returns how many were saved."""
+    stats = stats or IngestStats()
+    for batch in batched(papers, batch_size):
+        stats.saved += save_papers_to_supabase(batch)
+    return stats.saved
+
 
-    return papers
+def get_arxiv_papers(category="cs.ai", since=None) -> List[ArxivPaper]:
+    """
+    Fetch arXiv papers from the current RSS feed for a given category.
+
+    :param category: arXiv category to fetch papers from (default: 'cs.ai')
+    :param since: datetime object to fetch papers updated after this time
+    :return: List of ArxivPaper objects
+    """
+    return list(enrich_stage(parse_feed(category, since)))
 
 
 def get_paper_by_id(arxiv_id: str) -> Optional[ArxivPaper]:
+    """
+    Fetch an arXiv paper by its arxiv_id, from the in-process LRU when possible.
+    """
+    return paper_cache.get(lambda: query_paper_by_id(arxiv_id), key=arxiv_id)
+
+
+def query_paper_by_id(arxiv_id: str) -> Optional[ArxivPaper]:
     """
     Fetch an arXiv paper from the Supabase 'Arxiv' table by its arxiv_id.
     """
@@ -237,68 +1077,18 @@ def get_paper_by_id(arxiv_id: str) -> Optional[ArxivPaper]:
     if not result.data:
         return None
 
-    paper_data = result.data[0]
-
-    # Handle datetime parsing with potential fractional seconds
-    try:
-        updated = datetime.fromisoformat(paper_data["updated"])
-    except ValueError:
-        # If parsing fails, remove microseconds and try again
-        updated_str = paper_data["updated"].split(".")[0]
-        updated = datetime.fromisoformat(updated_str)
-
-    try:
-        published = datetime.fromisoformat(paper_data["published"])
-    except ValueError:
-        # If parsing fails, remove microseconds and try again
-        published_str = paper_data["published"].split(".")[0]
-        published = datetime.fromisoformat(published_str)
-
-    paper = ArxivPaper(
-        arxiv_id=paper_data["arxiv_id"],
-        title=paper_data["title"],
-        updated=updated,
-        abstract_link=paper_data["abstract_link"],
-        summary=paper_data["summary"],
-        categories=paper_data["categories"],
-        published=published,
-        announce_type=paper_data["announce_type"],
-        rights=paper_data["rights"],
-        journal_reference=paper_data["journal_reference"],
-        doi=paper_data["doi"],
-        creators=paper_data["creators"],
-        views=paper_data["views"],
-    )
+    return _paper_from_row(result.data[0])
 
-    return paper
 
-
-def get_most_popular_papers(limit=3) -> List[ArxivPaper]:
+def query_most_popular_papers(limit=3) -> List[ArxivPaper]:
     """
-    Get the papers with the most views from the most recent day in the Supabase 'Arxiv' table.
-
-    :param limit: Number of top papers to retrieve (default: 3)
-    :return: List of ArxivPaper objects with the most views, or empty list if no papers found
+    Query the papers with the most views from the most recent day in the Supabase 'Arxiv' table.
     """
     # Get the most recent date
-    result = (
-        supabase.table("Arxiv")
-        .select("updated")
-        .order("updated", desc=True)
-        .limit(1)
-        .execute()
-    )
-    if not result.data:
+    most_recent = get_most_recent_paper()
+    if most_recent is None:
         return []
-
-    # Parse the datetime string, handling potential microsecond precision
-    most_recent_date_str = result.data[0]["updated"]
-    try:
-        most_recent_date = datetime.fromisoformat(most_recent_date_str).date()
-    except ValueError:
-        # If parsing fails, remove microseconds and try again
-        most_recent_date_str = most_recent_date_str.split(".")[0] + "+00:00"
-        most_recent_date = datetime.fromisoformat(most_recent_date_str).date()
+    most_recent_date = most_recent.date()
 
     # Query for papers from the most recent date, ordered by views
     result = (
@@ -311,44 +1101,30 @@ def get_most_popular_papers(limit=3) -> List[ArxivPaper]:
         .execute()
     )
 
-    if not result.data:
-        return []
+    papers = [_paper_from_row(row) for row in result.data]
+    # The digest is made of these papers, so this is what its "Summarize" taps ask for;
+    # rcs_server runs this at startup and on every popular-papers refresh
+    warm_paper_cache(papers)
+    return papers
 
-    popular_papers = []
-    for paper_data in result.data:
-        # Handle datetime parsing with potential fractional seconds
-        try:
-            updated = datetime.fromisoformat(paper_data["updated"])
-        except ValueError:
-            # If parsing fails, remove microseconds and try again
-            updated_str = paper_data["updated"].split(".")[0]
-            updated = datetime.fromisoformat(updated_str)
 
-        try:
-            published = datetime.fromisoformat(paper_data["published"])
-        except ValueError:
-            # If parsing fails, remove microseconds and try again
-            published_str = paper_data["published"].split(".")[0]
-            published = datetime.fromisoformat(published_str)
-
-        paper = ArxivPaper(
-            arxiv_id=paper_data["arxiv_id"],
-            title=paper_data["title"],
-            updated=updated,
-            abstract_link=paper_data["abstract_link"],
-            summary=paper_data["summary"],
-            categories=paper_data["categories"],
-            published=published,
-            announce_type=paper_data["announce_type"],
-            rights=paper_data["rights"],
-            journal_reference=paper_data["journal_reference"],
-            doi=paper_data["doi"],
-            creators=paper_data["creators"],
-            views=paper_data["views"],
-        )
-        popular_papers.append(paper)
+def get_most_popular_papers(limit=3) -> List[ArxivPaper]:
+    """
+    Get the papers with the most views from the most recent day in the Supabase 'Arxiv' table.
+
+    The top POPULAR_PAPERS_CACHE_SIZE papers are kept in memory and refreshed ahead of
+    their TTL, so repeated calls (every "See Popular Papers" tap) are a memory read.
+    New papers are picked up within POPULAR_PAPERS_TTL_SECONDS.
 
-    return popular_papers
+    :param limit: Number of top papers to retrieve (default: 3)
+    :return: List of ArxivPaper objects with the most views, or empty list if no papers found
+    """
+    if limit > POPULAR_PAPERS_CACHE_SIZE:
+        return query_most_popular_papers(limit)
+    papers = popular_papers_cache.get(
+        lambda: query_most_popular_papers(POPULAR_PAPERS_CACHE_SIZE)
+    )
+    return papers[:limit]
 
 
 def save_papers_to_supabase(papers):
@@ -356,6 +1132,7 @@ def save_papers_to_supabase(papers):
     Save ArxivPaper objects to the Supabase 'Arxiv' table using batch insert.
 
     :param papers: List of ArxivPaper objects
+    :return: Number of papers saved
     """
     total_papers = len(papers)
 
@@ -374,42 +1151,48 @@ def save_papers_to_supabase(papers):
     result = supabase.table("Arxiv").insert(paper_dicts).execute()
 
     # Check the result
-    if result.data:
-        saved_count = len(result.data)
-        failed_count = total_papers - saved_count
+    saved_count = len(result.data) if result.data else 0
+    failed_count = total_papers - saved_count
+    if saved_count:
         print(f"Batch insert completed. Saved: {saved_count}, Failed: {failed_count}")
     else:
         print("Batch insert failed. No papers were saved.")
 
+    if saved_count:
+        get_paper_id_index().add(row["arxiv_id"] for row in result.data)
+
     print(
         f"Final result: {saved_count} papers saved, {failed_count} papers failed to save."
     )
+    return saved_count
 
 
 def check_for_new_papers():
     logging.info("Checking for new papers...")
     print("Checking for new papers...")
 
-    # Get papers from the RSS feed
-    papers = get_arxiv_papers()
+    # Finish digests an earlier run was interrupted in the middle of
+    resume_unfinished_digests()
 
-    if papers:
-        # Get existing paper IDs from the database
-        existing_paper_ids = get_existing_paper_ids()
+    # parse feed -> dedupe -> enrich -> persist, pulled lazily so only new papers
+    # are looked up on Mendeley
+    stats = IngestStats()
+    papers = parse_feeds(stats=stats)
+    new_papers = dedupe_papers(papers, stats=stats)
+    saved = persist_papers(enrich_stage(new_papers, stats), stats)
+    # Everything from these downloads is stored, so later runs may skip unchanged feeds
+    feed_fetcher.commit()
 
-        # Filter out papers that are already in the database
-        new_papers = [
-            paper for paper in papers if paper.arxiv_id not in existing_paper_ids
-        ]
+    print(stats.report())
+    logging.info(stats.report())
 
-        print(f"Total papers from RSS: {len(papers)}")
-        print(f"Existing paper IDs: {len(existing_paper_ids)}")
-        print(f"New papers: {len(new_papers)}")
+    if stats.parsed:
+        if saved:
+            print(f"Found {stats.new} new papers.")
+            logging.info(f"Saved {saved} new papers to Supabase.")
 
-        if new_papers:
-            print(f"Found {len(new_papers)} new papers.")
-            save_papers_to_supabase(new_papers)
-            logging.info(f"Saved {len(new_papers)} new papers to Supabase.")
+            # Rank by current readership, not the counts from when papers were stored
+            refresh_recent_views()
 
             # Get the top 3 most popular papers
             top_papers = get_most_popular_papers(limit=3)
@@ -418,9 +1201,10 @@ def check_for_new_papers():
 
             # Get all subscribers and send them the new papers and top 3 most popular papers
             subscribers = get_all_subscribers()
+            recipients = []
             for subscriber in subscribers:
                 if subscriber.is_subscribed:
-                    sendPapers(subscriber.phone_number, top_papers)
+                    recipients.append(subscriber.phone_number)
                 else:
                     logging.info(
                         f"Subscriber {subscriber.name} ({subscriber.phone_number}) is not currently subscribed"
@@ -428,9 +1212,13 @@ def check_for_new_papers():
                     print(
                         f"Subscriber {subscriber.name} ({subscriber.phone_number}) is not currently subscribed"
                     )
+            send_digest(recipients, top_papers)
         else:
             print("No new papers found.")
             logging.info("No new papers found.")
+    elif stats.unchanged_feeds:
+        print("Feeds unchanged since the last run.")
+        logging.info("Feeds unchanged since the last run.")
     else:
         print("No papers retrieved from RSS feed.")
         logging.info("No papers retrieved from RSS feed.")
@@ -469,16 +1257,8 @@ def get_all_subscribers() -> List[ArxivSubscriber]:
 
     subscribers = []
     for row in result.data:
-        try:
-            # Try parsing the datetime string directly
-            created_at = datetime.fromisoformat(row["created_at"])
-        except ValueError:
-            # If direct parsing fails, remove microseconds and try again
-            created_at_str = row["created_at"].split(".")[0]
-            created_at = datetime.fromisoformat(created_at_str)
-
         subscriber = ArxivSubscriber(
-            created_at=created_at,
+            created_at=_parse_timestamp(row["created_at"]),
             phone_number=row["phone_number"],
             name=row["name"],
             is_subscribed=row["arxiv"],
@@ -488,35 +1268,251 @@ def get_all_subscribers() -> List[ArxivSubscriber]:
     return subscribers
 
 
+def select_all_rows(build_query) -> List[dict]:
+    """Page through every row of an ordered query; build_query returns a fresh builder."""
+    rows = []
+    start = 0
+    while True:
+        result = build_query().range(start, start + SUPABASE_PAGE_SIZE - 1).execute()
+        rows.extend(result.data)
+        if len(result.data) < SUPABASE_PAGE_SIZE:
+            return rows
+        start += SUPABASE_PAGE_SIZE
+
+
 def get_existing_paper_ids():
     """
     Fetch all existing paper IDs from the Supabase 'Arxiv' table.
 
     :return: Set of existing arxiv_id strings
     """
-    result = supabase.table("Arxiv").select("arxiv_id").execute()
-    return set(row["arxiv_id"] for row in result.data)
+    ids = set()
+    start = 0
+    while True:
+        result = (
+            supabase.table("Arxiv")
+            .select("arxiv_id")
+            .order("arxiv_id")
+            .range(start, start + SUPABASE_PAGE_SIZE - 1)
+            .execute()
+        )
+        ids.update(row["arxiv_id"] for row in result.data)
+        if len(result.data) < SUPABASE_PAGE_SIZE:
+            return ids
+        start += SUPABASE_PAGE_SIZE
+
+
+class PaperIdIndex:
+    """
+    Sorted list of arxiv_ids known to be stored in Supabase, searched with bisect.
+
+    Supabase is the source of truth: IDs missing locally are confirmed with a
+    single in_ query per batch before they count as new, so deduplicating a
+    feed costs O(feed size) and never a scan of the whole table. The index only
+    saves those queries for IDs already seen. It is persisted as an append-only
+    file under STATE_DIR and starts empty when the file is missing, as it is in
+    every fresh cron container without a persistent volume.
+    """
+
+    def __init__(self, path: str = PAPER_ID_INDEX_PATH):
+        self.path = path
+        self._ids: Optional[List[str]] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        # Caller holds self._lock
+        if self._ids is not None:
+            return
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                self._ids = sorted({line.strip() for line in f if line.strip()})
+        else:
+            self._ids = []
+
+    def _contains(self, arxiv_id: str) -> bool:
+        index = bisect_left(self._ids, arxiv_id)
+        return index < len(self._ids) and self._ids[index] == arxiv_id
+
+    def __contains__(self, arxiv_id: str) -> bool:
+        with self._lock:
+            self._ensure_loaded()
+            return self._contains(arxiv_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._ids)
+
+    def add(self, arxiv_ids: Iterable[str]):
+        with self._lock:
+            self._ensure_loaded()
+            added = []
+            for arxiv_id in arxiv_ids:
+                if not self._contains(arxiv_id):
+                    self._ids.insert(bisect_left(self._ids, arxiv_id), arxiv_id)
+                    added.append(arxiv_id)
+            if added:
+                with open(self.path, "a") as f:
+                    f.writelines(f"{arxiv_id}\n" for arxiv_id in added)
+
+    def filter_new(self, arxiv_ids: Iterable[str]) -> Set[str]:
+        """Return the IDs that are not stored yet."""
+        candidates = {arxiv_id for arxiv_id in arxiv_ids if arxiv_id not in self}
+        if not candidates:
+            return candidates
+        result = (
+            supabase.table("Arxiv")
+            .select("arxiv_id")
+            .in_("arxiv_id", list(candidates))
+            .execute()
+        )
+        stored = {row["arxiv_id"] for row in result.data}
+        self.add(stored)
+        return candidates - stored
+
+
+_paper_id_index: Optional[PaperIdIndex] = None
+_paper_id_index_lock = threading.Lock()
+
+
+def get_paper_id_index() -> PaperIdIndex:
+    """The shared paper ID index, created on first use."""
+    global _paper_id_index
+    with _paper_id_index_lock:
+        if _paper_id_index is None:
+            _paper_id_index = PaperIdIndex()
+        return _paper_id_index
 
 
 class TimedCache:
-    def __init__(self, expiration_time):
-        self.expiration_time = expiration_time
-        self.cached_value = None
-        self.last_update_time = None
+    """
+    Keyed cache whose entries expire expiration_time after they were stored.
+
+    At most max_entries are kept, evicting the least recently used. With
+    refresh_ahead (a fraction of expiration_time), a hit on an entry older than
+    that is still served but refreshed in a background thread, so frequently
+    read keys are renewed before they expire. None is never cached.
+    """
+
+    # Misses are computed under one of a fixed set of locks, so the lock count
+    # stays bounded however many distinct keys are requested
+    KEY_LOCK_STRIPES = 64
 
-    def get(self, update_func):
-        current_time = datetime.now()
-        if (
-            self.cached_value is None
-            or self.last_update_time is None
-            or (current_time - self.last_update_time) > self.expiration_time
-        ):
-            self.cached_value = update_func()
-            self.last_update_time = current_time
-        return self.cached_value
+    def __init__(self, expiration_time, max_entries=None, refresh_ahead=None):
+        self.expiration_time = expiration_time
+        self.max_entries = max_entries
+        self.refresh_ahead = refresh_ahead
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._key_locks = [threading.Lock() for _ in range(self.KEY_LOCK_STRIPES)]
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key, now):
+        # Caller holds self._lock
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if now - entry[1] > self.expiration_time:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._lookup(key, datetime.now()) is not None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def set(self, key, value, stored_at=None):
+        if value is None:
+            return
+        with self._lock:
+            self._entries[key] = (value, stored_at or datetime.now())
+            self._entries.move_to_end(key)
+            while self.max_entries is not None and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _refresh(self, key, update_func):
+        try:
+            self.set(key, update_func())
+        except Exception as e:
+            logging.error(f"Background refresh of {key} failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, update_func, key=None):
+        with self._lock:
+            now = datetime.now()
+            entry = self._lookup(key, now)
+            if entry is not None:
+                value, stored_at = entry
+                if (
+                    self.refresh_ahead is not None
+                    and now - stored_at > self.expiration_time * self.refresh_ahead
+                    and key not in self._refreshing
+                ):
+                    self._refreshing.add(key)
+                    threading.Thread(
+                        target=self._refresh, args=(key, update_func), daemon=True
+                    ).start()
+                self.hits += 1
+                return value
+            self.misses += 1
+            key_lock = self._key_locks[hash(key) % self.KEY_LOCK_STRIPES]
+
+        # Only one caller computes a missing key; the others wait and reuse its value.
+        # Keys sharing a stripe also wait, so update_func must not read this cache.
+        with key_lock:
+            with self._lock:
+                entry = self._lookup(key, datetime.now())
+            if entry is not None:
+                return entry[0]
+            value = update_func()
+            self.set(key, value)
+            return value
+
+
+mendeley_session_cache = TimedCache(timedelta(minutes=30), max_entries=1)
+popular_papers_cache = TimedCache(
+    timedelta(seconds=POPULAR_PAPERS_TTL_SECONDS), max_entries=1, refresh_ahead=0.8
+)
+paper_cache = TimedCache(
+    timedelta(seconds=PAPER_CACHE_TTL_SECONDS), max_entries=PAPER_CACHE_SIZE
+)
+
+
+def warm_paper_cache(papers: List[ArxivPaper]):
+    """
+    Preload papers that are about to be tapped. The cache is per process, so this
+    only helps lookups made in the same process (rcs_server, not the cron job).
+    """
+    for paper in papers:
+        paper_cache.set(paper.arxiv_id, paper)
 
 
-mendeley_session_cache = TimedCache(timedelta(minutes=30))
+def cache_stats() -> Dict[str, Dict[str, float]]:
+    return {
+        "papers": paper_cache.stats(),
+        "popular_papers": popular_papers_cache.stats(),
+    }
 
 
 def get_mendeley_session():
@@ -534,21 +1530,218 @@ def get_mendeley_session():
     return mendeley_session_cache.get(create_session)
 
 
-def get_views(DOI: str) -> int:
+def get_views(DOI: str, session=None, default: Optional[int] = 0) -> Optional[int]:
+    """
+    Look up the Mendeley reader count for a DOI, retrying transient failures with
+    exponential backoff and jitter. Unknown DOIs count as 0 views; once retries are
+    exhausted default is returned.
+    """
+    for attempt in range(MENDELEY_MAX_RETRIES + 1):
+        try:
+            if session is None:
+                session = get_mendeley_session()
+
+            print(f"Searching for DOI: {DOI}")
+
+            # Search for the paper using its DOI
+            doc = session.catalog.by_identifier(doi=DOI, view="stats")
+
+            if doc:
+                print(f"Document found. Reader count: {doc.reader_count}")
+                return doc.reader_count
+            else:
+                print("Document not found")
+                return 0
+        except Exception as e:
+            # The catalog answers 404 for DOIs it does not know; that is not worth retrying
+            if getattr(e, "status", None) == 404:
+                print(f"Document not found for DOI {DOI}")
+                return 0
+            if attempt == MENDELEY_MAX_RETRIES:
+                logging.error(f"Failed to get views for DOI {DOI}: {str(e)}")
+                return default
+            delay = MENDELEY_BACKOFF_SECONDS * 2**attempt * (0.5 + random.random())
+            logging.warning(
+                f"Retrying DOI {DOI} in {delay:.1f}s after error: {str(e)}"
+            )
+            time.sleep(delay)
+    return default
+
+
+class ReaderCountCache:
+    """
+    DOI -> Mendeley reader count, a dedup store for lookups rather than a source
+    of truth (that is the Arxiv views column). Within a run it keeps the views
+    refresh from looking up DOIs that were just enriched. Counts are also
+    persisted to SQLite with the time they were fetched, which lets later runs
+    skip recent lookups only when STATE_DIR is on a persistent volume. Failed
+    lookups are not cached.
+    """
+
+    def __init__(
+        self,
+        path: str = READER_COUNT_CACHE_PATH,
+        ttl: timedelta = timedelta(hours=READER_COUNT_TTL_HOURS),
+        max_entries: int = READER_COUNT_CACHE_SIZE,
+    ):
+        self.memory = TimedCache(ttl, max_entries=max_entries)
+        self.fetches = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS reader_counts ("
+            " doi TEXT PRIMARY KEY,"
+            " reader_count INTEGER NOT NULL,"
+            " fetched_at TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _load(self, doi: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT reader_count, fetched_at FROM reader_counts WHERE doi = ?", (doi,)
+            ).fetchone()
+        if row:
+            # Keep the original fetch time so persisted counts expire on schedule
+            self.memory.set(doi, row[0], datetime.fromisoformat(row[1]))
+
+    def _fetch(self, doi: str, session) -> Optional[int]:
+        with self._lock:
+            self.fetches += 1
+        count = get_views(doi, session, default=None)
+        if count is not None:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO reader_counts (doi, reader_count, fetched_at) VALUES (?, ?, ?)",
+                    (doi, count, datetime.now().isoformat()),
+                )
+                self._conn.commit()
+        return count
+
+    def lookup(self, doi: str, session=None) -> Optional[int]:
+        """The reader count, or None if it could not be fetched."""
+        if doi not in self.memory:
+            self._load(doi)
+        return self.memory.get(lambda: self._fetch(doi, session), key=doi)
+
+    def get(self, doi: str, session=None) -> int:
+        count = self.lookup(doi, session)
+        return 0 if count is None else count
+
+
+_reader_count_cache: Optional[ReaderCountCache] = None
+_reader_count_cache_lock = threading.Lock()
+
+
+def get_reader_count_cache() -> ReaderCountCache:
+    """The shared reader count store, opened on first use so importing this module creates no files."""
+    global _reader_count_cache
+    with _reader_count_cache_lock:
+        if _reader_count_cache is None:
+            _reader_count_cache = ReaderCountCache()
+        return _reader_count_cache
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def enrich_papers(
+    papers: List[ArxivPaper],
+    max_workers: int = MENDELEY_MAX_WORKERS,
+    cache: Optional[ReaderCountCache] = None,
+) -> List[ArxivPaper]:
+    """
+    Fill in paper.views for every paper with a DOI using a bounded pool of workers
+    that share one authenticated Mendeley session, then report lookup latency.
+    """
+    to_enrich = [paper for paper in papers if paper.doi]
+    if not to_enrich:
+        return papers
+
     try:
         session = get_mendeley_session()
+    except Exception as e:
+        logging.error(f"Failed to start Mendeley session, skipping enrichment: {str(e)}")
+        return papers
+    cache = cache or get_reader_count_cache()
+
+    def lookup(paper: ArxivPaper) -> Tuple[ArxivPaper, float]:
+        start = time.perf_counter()
+        paper.views = cache.get(paper.doi, session)
+        return paper, time.perf_counter() - start
+
+    start = time.perf_counter()
+    fetches = cache.fetches
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        latencies = [latency for _, latency in pool.map(lookup, to_enrich)]
+    elapsed = time.perf_counter() - start
+    fetches = cache.fetches - fetches
+
+    summary = (
+        f"Enriched {len(to_enrich)} papers ({fetches} Mendeley lookups, "
+        f"{len(to_enrich) - fetches} cached) in {elapsed:.2f}s with {max_workers} workers "
+        f"(p50 {percentile(latencies, 50) * 1000:.0f}ms, p99 {percentile(latencies, 99) * 1000:.0f}ms)"
+    )
+    logging.info(summary)
+    print(summary)
+    return papers
 
-        print(f"Searching for DOI: {DOI}")
 
-        # Search for the paper using its DOI
-        doc = session.catalog.by_identifier(doi=DOI, view="stats")
+def refresh_recent_views(
+    days: int = VIEWS_REFRESH_DAYS,
+    max_workers: int = MENDELEY_MAX_WORKERS,
+    cache: Optional[ReaderCountCache] = None,
+) -> int:
+    """
+    Re-read the reader counts of stored papers from the most recent days through
+    the reader count cache and write the ones that changed back to the Arxiv
+    views column, so the popular papers reflect readership now rather than at
+    ingest. Papers enriched earlier in this run are cache hits. Failed lookups
+    leave the stored count alone. Returns how many papers were updated.
+    """
+    most_recent = get_most_recent_paper()
+    if most_recent is None:
+        return 0
+    since = most_recent.date() - timedelta(days=days - 1)
+    rows = select_all_rows(
+        lambda: supabase.table("Arxiv")
+        .select("arxiv_id, doi, views")
+        .gte("updated", since.isoformat())
+        .order("arxiv_id")
+    )
+    rows = [row for row in rows if row["doi"]]
+    if not rows:
+        return 0
 
-        if doc:
-            print(f"Document found. Reader count: {doc.reader_count}")
-            return doc.reader_count
-        else:
-            print("Document not found")
-            return 0
+    try:
+        session = get_mendeley_session()
     except Exception as e:
-        logging.error(f"Failed to get views for DOI {DOI}: {str(e)}")
+        logging.error(f"Failed to start Mendeley session, skipping views refresh: {str(e)}")
         return 0
+    cache = cache or get_reader_count_cache()
+
+    def refresh(row: dict) -> bool:
+        count = cache.lookup(row["doi"], session)
+        if count is None or count == row["views"]:
+            return False
+        supabase.table("Arxiv").update({"views": count}).eq("arxiv_id", row["arxiv_id"]).execute()
+        return True
+
+    start = time.perf_counter()
+    fetches = cache.fetches
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        updated = sum(pool.map(refresh, rows))
+    summary = (
+        f"Refreshed views of {len(rows)} papers since {since.isoformat()} "
+        f"({cache.fetches - fetches} Mendeley lookups, {updated} changed) "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    logging.info(summary)
+    print(summary)
+    return updated
@@ -0,0 +1,146 @@
+"""
+Ack-first check for rcs_server. A burst of text messages from a few senders is
+sent against a stub RCS listener that takes --latency seconds per message,
+once with the synchronous handler and once with ACK_FIRST on. Reports ack
+latency, checks every sender's messages reached the listener in order after
+the shutdown drain, and shows the 503s returned once a small queue fills
+(senders retry those, as a webhook sender would).
+
+    python -m benchmarks.ack_first --senders 5 --messages 40 --latency 0.1
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.relay_load import SERVER_DIR, percentile
+
+RETRY_DELAY_SECONDS = 0.05
+
+
+def start_recording_listener(latency):
+    received = defaultdict(list)
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            message = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            time.sleep(latency)
+            with lock:
+                received[message["from"]].append(int(message["text"]))
+            body = b'{"status":"ok"}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 1024
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, received
+
+
+async def burst(rcs_server, senders, messages):
+    import httpx
+
+    headers = {"pinnacle-signing-secret": os.environ["PINNACLE_SIGNING_SECRET"]}
+    latencies = []
+    statuses = defaultdict(int)
+
+    async with rcs_server.lifespan(rcs_server.app):
+        transport = httpx.ASGITransport(app=rcs_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://relay", timeout=120) as client:
+
+            async def sender(number):
+                # Each sender posts its messages one after another, like a phone would
+                for sequence in range(messages):
+                    body = json.dumps({
+                        "from": f"+1555000{number:04d}", "to": "+15551111111",
+                        "messageType": "text", "text": str(sequence),
+                    })
+                    while True:
+                        start = time.perf_counter()
+                        response = await client.post("/", content=body, headers=headers)
+                        latencies.append(time.perf_counter() - start)
+                        statuses[response.status_code] += 1
+                        if response.status_code != 503:
+                            break
+                        # Backpressure: retry later, as the webhook sender would
+                        await asyncio.sleep(RETRY_DELAY_SECONDS)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(sender(number) for number in range(senders)))
+            acked = time.perf_counter() - start
+            stats = (await client.get("/queue-stats")).json()
+        # Leaving the lifespan drains the queue
+    return latencies, statuses, acked, time.perf_counter() - start, stats
+
+
+def check_order(received, senders, messages):
+    in_order = all(received[f"+1555000{n:04d}"] == sorted(received[f"+1555000{n:04d}"]) for n in range(senders))
+    return in_order, sum(len(values) for values in received.values())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--senders", type=int, default=5)
+    parser.add_argument("--messages", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds the stub listener takes per message")
+    args = parser.parse_args()
+
+    listener, received = start_recording_listener(args.latency)
+    os.environ["RCS_URL"] = f"http://127.0.0.1:{listener.server_port}/api/rcs"
+    os.environ.setdefault("PINNACLE_SIGNING_SECRET", "benchmark")
+    os.environ.setdefault("WARM_CACHES_ON_STARTUP", "false")
+    os.environ.setdefault("PINNACLE_API_KEY", "benchmark")
+    os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+    os.environ.setdefault("SUPABASE_KEY", "benchmark.benchmark.benchmark")
+    sys.path.insert(0, os.path.join(SERVER_DIR, "rcs"))
+
+    import rcs_server
+
+    logging.getLogger().setLevel(logging.CRITICAL)
+    total = args.senders * args.messages
+
+    for label, ack_first, max_size in (
+        ("synchronous", False, rcs_server.WORK_QUEUE_MAX_SIZE),
+        ("ack-first", True, rcs_server.WORK_QUEUE_MAX_SIZE),
+        ("ack-first, tiny queue", True, args.senders),
+    ):
+        rcs_server.ACK_FIRST = ack_first
+        rcs_server.WORK_QUEUE_MAX_SIZE = max_size
+        received.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            latencies, statuses, acked, finished, stats = asyncio.run(
+                burst(rcs_server, args.senders, args.messages)
+            )
+        in_order, delivered = check_order(received, args.senders, args.messages)
+        print(
+            f"{label:<22} ack p50 {percentile(latencies, 50) * 1000:7.1f}ms p99 {percentile(latencies, 99) * 1000:7.1f}ms | "
+            f"acked in {acked:5.2f}s, drained in {finished:5.2f}s | "
+            f"{delivered}/{total} delivered, in order: {in_order}, statuses {dict(statuses)}"
+        )
+        if stats.get("enabled"):
+            print(f"{'':<22} queue stats at end of burst: {stats}")
+    listener.shutdown()
+
+
+if __name__ == "__main__":
+    main()
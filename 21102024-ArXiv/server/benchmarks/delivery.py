@@ -0,0 +1,80 @@
+"""
+Serial sendPapers loop vs deliver_papers fan-out against the fake Pinnacle server.
+
+    python -m benchmarks.delivery --subscribers 200 --latency 0.2 --failure-rate 0.05
+"""
+import argparse
+import os
+from datetime import datetime, timezone
+
+from benchmarks.fake_pinnacle import FakePinnacleServer
+
+
+def make_papers(count=3):
+    from arxiv.send_functions import ArxivPaper
+
+    now = datetime.now(timezone.utc)
+    return [
+        ArxivPaper(
+            arxiv_id=f"2410.{n:05d}",
+            title=f"Paper {n}",
+            updated=now,
+            abstract_link=f"https://arxiv.org/abs/2410.{n:05d}",
+            summary="",
+            categories=["cs.AI"],
+            published=now,
+            announce_type="new",
+            rights="",
+            journal_reference=None,
+            doi=None,
+            creators="Author One, Author Two",
+            views=100 - n,
+        )
+        for n in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--rate-limit", type=int, default=50, help="fake server requests per second")
+    parser.add_argument("--serial-sample", type=int, default=20, help="subscribers timed for the serial loop")
+    args = parser.parse_args()
+
+    server = FakePinnacleServer(args.latency, args.failure_rate, args.rate_limit).start()
+    os.environ["PINNACLE_BASE_URL"] = server.url
+    os.environ.setdefault("PINNACLE_API_KEY", "benchmark")
+    os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+    os.environ.setdefault("SUPABASE_KEY", "benchmark.benchmark.benchmark")
+    os.environ.setdefault("SEND_RATE_PER_SECOND", str(args.rate_limit))
+    os.environ.setdefault("SEND_BACKOFF_SECONDS", "0.05")
+
+    import time
+
+    from arxiv import send_functions
+
+    papers = make_papers()
+    recipients = [f"+1555{n:07d}" for n in range(args.subscribers)]
+
+    start = time.perf_counter()
+    for to in recipients[: args.serial_sample]:
+        send_functions.sendPapers(to, papers)
+    serial_per_recipient = (time.perf_counter() - start) / args.serial_sample
+
+    server.requests.clear()
+    server.delivered.clear()
+    result = send_functions.deliver_papers(recipients, papers)
+
+    duplicates = sum(1 for count in server.delivered.values() if count > 1)
+    print(f"serial loop: {serial_per_recipient * 1000:.0f}ms/recipient, "
+          f"~{serial_per_recipient * args.subscribers:.1f}s for {args.subscribers}")
+    print(f"fan-out:     {result.elapsed / args.subscribers * 1000:.0f}ms/recipient, {result.elapsed:.1f}s total")
+    print(f"server saw {sum(server.requests.values())} requests, {server.throttled} throttled, "
+          f"{len(server.delivered)} recipients delivered, {duplicates} delivered twice")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Per-recipient CPU cost of preparing a digest send: rebuilding Cards/Actions and
+serializing them through the SDK for every subscriber vs rendering a
+DigestTemplate built once.
+
+    python -m benchmarks.digest_template --subscribers 10000
+"""
+import argparse
+import json
+import os
+import time
+import typing
+
+os.environ.setdefault("PINNACLE_API_KEY", "benchmark")
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark.benchmark.benchmark")
+
+from rcs import Action, Card
+from rcs.core.jsonable_encoder import jsonable_encoder
+from rcs.core.serialization import convert_and_respect_annotation_metadata
+
+from arxiv.send_functions import DigestTemplate, build_paper_message
+from benchmarks.delivery import make_papers
+
+
+def sdk_body(to, papers):
+    """What AsyncPinnacle.send.rcs does before each request."""
+    cards, quick_replies = build_paper_message(papers)
+    body = {
+        "from": "test",
+        "to": to,
+        "cards": convert_and_respect_annotation_metadata(
+            object_=cards, annotation=typing.Sequence[Card], direction="write"
+        ),
+        "quickReplies": convert_and_respect_annotation_metadata(
+            object_=quick_replies, annotation=typing.Sequence[Action], direction="write"
+        ),
+    }
+    return json.dumps(jsonable_encoder(body), separators=(",", ":")).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=10000)
+    parser.add_argument("--papers", type=int, default=3)
+    args = parser.parse_args()
+
+    papers = make_papers(args.papers)
+    recipients = [f"+1555{n:07d}" for n in range(args.subscribers)]
+
+    template = DigestTemplate.from_papers(papers)
+    assert json.loads(template.render(recipients[0])) == json.loads(sdk_body(recipients[0], papers))
+
+    start = time.process_time()
+    for to in recipients:
+        sdk_body(to, papers)
+    rebuilt = time.process_time() - start
+
+    start = time.process_time()
+    template = DigestTemplate.from_papers(papers)
+    for to in recipients:
+        template.render(to)
+    rendered = time.process_time() - start
+
+    per_rebuilt = rebuilt / args.subscribers * 1e6
+    per_rendered = rendered / args.subscribers * 1e6
+    print(f"{args.subscribers} subscribers, {args.papers} cards each")
+    print(f"rebuild per recipient:  {per_rebuilt:8.1f}us CPU ({rebuilt:.2f}s total)")
+    print(f"template per recipient: {per_rendered:8.1f}us CPU ({rendered:.3f}s total, including the one build)")
+    print(f"saved {per_rebuilt - per_rendered:.1f}us per recipient ({per_rebuilt / per_rendered:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
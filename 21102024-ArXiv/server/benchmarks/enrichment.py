@@ -0,0 +1,98 @@
+"""
+Serial vs pooled Mendeley enrichment against a fake catalog with fixed latency
+and a small share of transient failures, plus a rerun served from the
+reader-count cache.
+
+    python -m benchmarks.enrichment --papers 300 --latency 0.2
+"""
+import argparse
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("PINNACLE_API_KEY", "benchmark")
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark.benchmark.benchmark")
+os.environ.setdefault("MENDELEY_BACKOFF_SECONDS", "0.05")
+
+from arxiv import send_functions
+from arxiv.send_functions import ArxivPaper
+
+
+class FakeCatalogError(Exception):
+    status = 503
+
+
+class FakeCatalog:
+    def __init__(self, latency, failure_rate):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def by_identifier(self, doi, view):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        if random.random() < self.failure_rate:
+            raise FakeCatalogError("service unavailable")
+        return type("Document", (), {"reader_count": sum(map(ord, doi)) % 500})()
+
+
+class FakeSession:
+    def __init__(self, latency, failure_rate):
+        self.catalog = FakeCatalog(latency, failure_rate)
+
+
+def make_papers(count):
+    now = datetime.now(timezone.utc)
+    return [
+        ArxivPaper(
+            arxiv_id=f"2410.{n:05d}",
+            title=f"Paper {n}",
+            updated=now,
+            abstract_link=f"https://arxiv.org/abs/2410.{n:05d}",
+            summary="",
+            categories=["cs.AI"],
+            published=now,
+            announce_type="new",
+            rights="",
+            journal_reference=None,
+            doi=f"10.48550/arXiv.2410.{n:05d}",
+            creators="",
+        )
+        for n in range(count)
+    ]
+
+
+def run(papers, workers, session, cache):
+    send_functions.mendeley_session_cache.set(None, session)
+    start = time.perf_counter()
+    send_functions.enrich_papers(papers, max_workers=workers, cache=cache)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--papers", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--workers", type=int, default=send_functions.MENDELEY_MAX_WORKERS)
+    args = parser.parse_args()
+
+    session = FakeSession(args.latency, args.failure_rate)
+    serial = run(make_papers(args.papers), 1, session, send_functions.ReaderCountCache(":memory:"))
+    pooled_papers = make_papers(args.papers)
+    cache = send_functions.ReaderCountCache(":memory:")
+    pooled = run(pooled_papers, args.workers, session, cache)
+    cached = run(make_papers(args.papers), args.workers, session, cache)
+
+    print(f"serial: {serial:.2f}s  pooled ({args.workers} workers): {pooled:.2f}s  speedup: {serial / pooled:.1f}x")
+    print(f"cached rerun: {cached:.2f}s")
+    print(f"papers with views: {sum(1 for paper in pooled_papers if paper.views)}/{args.papers}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Concurrency check for rcs_server: one "Summarize" tap whose Supabase lookup
+takes --slow seconds is sent together with a burst of unrelated text messages.
+With send_functions calls run inline on the event loop the text messages wait
+for the slow tap; on the executor they are forwarded straight away.
+
+    python -m benchmarks.event_loop_blocking --slow 2 --messages 20
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from benchmarks.relay_load import SERVER_DIR, percentile, start_listener
+
+
+async def run_inline(app, func, *args):
+    """The old behaviour: call the blocking function on the event loop."""
+    return func(*args)
+
+
+async def scenario(rcs_server, slow, messages):
+    import httpx
+
+    headers = {"pinnacle-signing-secret": os.environ["PINNACLE_SIGNING_SECRET"]}
+    tap = json.dumps({
+        "from": "+15550000000", "to": "+15551111111", "messageType": "action",
+        "actionTitle": "Summarize", "payload": "PAPER_2410.00001",
+    })
+    text = json.dumps({"from": "+15552222222", "to": "+15551111111", "messageType": "text", "text": "hi"})
+
+    async with rcs_server.lifespan(rcs_server.app):
+        transport = httpx.ASGITransport(app=rcs_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://relay", timeout=60) as client:
+
+            t0 = time.perf_counter()
+
+            async def timed(body, delay=0.0):
+                # Latency counts from when the message was due, so time spent
+                # waiting on a blocked event loop is included
+                await asyncio.sleep(delay)
+                start = t0 + delay
+                response = await client.post("/", content=body, headers=headers)
+                if response.status_code != 200:
+                    raise RuntimeError(response.text)
+                return time.perf_counter() - start
+
+            # Text messages arrive just after the slow tap has started
+            results = await asyncio.gather(
+                timed(tap), *(timed(text, delay=0.05) for _ in range(messages))
+            )
+    return results[0], results[1:]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slow", type=float, default=2.0, help="seconds the Supabase lookup takes")
+    parser.add_argument("--messages", type=int, default=20)
+    args = parser.parse_args()
+
+    listener = start_listener(0.005)
+    os.environ["RCS_URL"] = f"http://127.0.0.1:{listener.server_port}/api/rcs"
+    os.environ.setdefault("PINNACLE_SIGNING_SECRET", "benchmark")
+    os.environ.setdefault("WARM_CACHES_ON_STARTUP", "false")
+    os.environ.setdefault("PINNACLE_API_KEY", "benchmark")
+    os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+    os.environ.setdefault("SUPABASE_KEY", "benchmark.benchmark.benchmark")
+    sys.path.insert(0, os.path.join(SERVER_DIR, "rcs"))
+
+    import rcs_server
+    from arxiv import send_functions
+    from benchmarks.delivery import make_papers
+
+    logging.getLogger().setLevel(logging.WARNING)
+    paper = make_papers(1)[0]
+
+    def slow_lookup(arxiv_id):
+        time.sleep(args.slow)
+        return paper
+
+    send_functions.query_paper_by_id = slow_lookup
+    send_functions.client = SimpleNamespace(send=SimpleNamespace(rcs=lambda **kwargs: "sent"))
+
+    offloaded = rcs_server.run_blocking
+    for label, runner in (("inline (before)", run_inline), ("executor (after)", offloaded)):
+        rcs_server.run_blocking = runner
+        send_functions.paper_cache.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            tap_latency, text_latencies = asyncio.run(scenario(rcs_server, args.slow, args.messages))
+        print(
+            f"{label:<17} slow tap {tap_latency:5.2f}s | {args.messages} text messages "
+            f"p50 {percentile(text_latencies, 50) * 1000:7.1f}ms p99 {percentile(text_latencies, 99) * 1000:7.1f}ms"
+        )
+    rcs_server.run_blocking = offloaded
+    listener.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Local stand-in for the Pinnacle send API. POST /send/rcs answers after a fixed
+latency, fails a share of requests with 500/429, and enforces a requests-per-second
+limit so rate limiting and retries can be exercised without sending real messages.
+Like the real API, it ignores the Idempotency-Key header unless created with
+honour_idempotency_keys=True, which acknowledges a repeated key without
+delivering again.
+
+    server = FakePinnacleServer(latency=0.2, failure_rate=0.05).start()
+    os.environ["PINNACLE_BASE_URL"] = server.url
+"""
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that are killed mid-request are part of the crash/resume benchmarks
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakePinnacleServer:
+    def __init__(self, latency=0.2, failure_rate=0.0, rate_limit=None, honour_idempotency_keys=False):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rate_limit = rate_limit
+        self.honour_idempotency_keys = honour_idempotency_keys
+        self.requests = Counter()
+        self.delivered = Counter()
+        self.throttled = 0
+        self.replayed = 0
+        self._delivered_keys = set()
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self._server = _QuietServer(("127.0.0.1", 0), self._handler())
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _over_limit(self):
+        if self.rate_limit is None:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] > 1:
+                self._recent.popleft()
+            if len(self._recent) >= self.rate_limit:
+                self.throttled += 1
+                return True
+            self._recent.append(now)
+            return False
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if self.path.rstrip("/") != "/send/rcs":
+                    self._reply(404, {"error": "not found"})
+                    return
+                to = body.get("to")
+                with fake._lock:
+                    fake.requests[to] += 1
+                if fake._over_limit():
+                    self._reply(429, {"error": "rate limited"})
+                    return
+                time.sleep(fake.latency)
+                if random.random() < fake.failure_rate:
+                    self._reply(500, {"error": "internal error"})
+                    return
+                key = self.headers.get("Idempotency-Key") if fake.honour_idempotency_keys else None
+                with fake._lock:
+                    if key is not None and key in fake._delivered_keys:
+                        fake.replayed += 1
+                        self._reply(200, {"messageId": f"msg_{key}", "message": "duplicate"})
+                        return
+                    if key is not None:
+                        fake._delivered_keys.add(key)
+                    fake.delivered[to] += 1
+                self._reply(200, {"messageId": f"msg_{to}_{fake.delivered[to]}", "message": "queued"})
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
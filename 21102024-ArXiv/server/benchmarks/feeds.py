@@ -0,0 +1,131 @@
+"""
+Fetching several category feeds: the old serial feedparser.parse(url) loop vs
+FeedFetcher (concurrent conditional GETs + process-pool parsing), cold and
+with every feed unchanged. Feeds are served locally with per-request latency.
+
+    python -m benchmarks.feeds --categories 6 --entries 400 --latency 0.3
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("PINNACLE_API_KEY", "benchmark")
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark.benchmark.benchmark")
+
+ENTRY = """  <entry>
+    <id>oai:arXiv.org:2410.{number:05d}v1</id>
+    <title>Paper {number} on {category}</title>
+    <updated>2024-10-21T00:00:00Z</updated>
+    <link href="https://arxiv.org/abs/2410.{number:05d}" rel="alternate" type="text/html"/>
+    <summary>arXiv:2410.{number:05d}v1 Announce Type: new
+Abstract: {abstract}</summary>
+    <category term="{category}" scheme="http://arxiv.org/schemas/atom"/>
+    <published>2024-10-21T00:00:00Z</published>
+    <arxiv:announce_type>new</arxiv:announce_type>
+    <arxiv:DOI>10.48550/arXiv.2410.{number:05d}</arxiv:DOI>
+    <author><name>Author {number}</name></author>
+  </entry>
+"""
+
+
+def make_feed(category, index, entries):
+    # Neighbouring categories share a quarter of their papers, like cross-listings
+    start = index * entries * 3 // 4
+    body = "".join(
+        ENTRY.format(number=number, category=category, abstract="Lorem ipsum dolor sit amet. " * 20)
+        for number in range(start, start + entries)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom">\n'
+        f"  <title>{category} updates on arXiv.org</title>\n{body}</feed>\n"
+    ).encode()
+
+
+def serve(feeds, latency):
+    etags = {f"/{category}": hashlib.sha256(body).hexdigest() for category, body in feeds.items()}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            etag = etags.get(self.path)
+            if etag is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = feeds[self.path[1:]]
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "application/atom+xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--categories", type=int, default=6)
+    parser.add_argument("--entries", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    categories = [f"cs.X{index}" for index in range(args.categories)]
+    feeds = {category: make_feed(category, index, args.entries) for index, category in enumerate(categories)}
+    server = serve(feeds, args.latency)
+    os.environ["FEED_BASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+
+    import feedparser
+
+    from arxiv import send_functions
+    from arxiv.send_functions import FeedFetcher, IngestStats, paper_from_entry, parse_feeds
+
+    start = time.perf_counter()
+    serial = {}
+    for category in categories:
+        for entry in feedparser.parse(f"{send_functions.FEED_BASE_URL}/{category}").entries:
+            paper = paper_from_entry(entry)
+            serial.setdefault(paper.arxiv_id, paper)
+    serial_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        fetcher = FeedFetcher(os.path.join(directory, "feed_state.json"))
+
+        stats = IngestStats()
+        start = time.perf_counter()
+        papers = list(parse_feeds(categories, stats=stats, fetcher=fetcher))
+        cold_time = time.perf_counter() - start
+        fetcher.commit()
+
+        warm_stats = IngestStats()
+        start = time.perf_counter()
+        unchanged = list(parse_feeds(categories, stats=warm_stats, fetcher=fetcher))
+        warm_time = time.perf_counter() - start
+
+    assert len(papers) == len(serial), (len(papers), len(serial))
+    assert not unchanged and warm_stats.unchanged_feeds == len(categories)
+    print(f"{len(categories)} feeds, {stats.parsed} entries, {len(papers)} unique papers ({stats.cross_listed} cross-listed)")
+    print(f"serial feedparser: {serial_time:.2f}s")
+    print(f"FeedFetcher cold:  {cold_time:.2f}s ({serial_time / cold_time:.1f}x)")
+    print(f"FeedFetcher 304s:  {warm_time * 1000:.0f}ms (excluding {args.latency * 1000:.0f}ms server latency: "
+          f"{(warm_time - args.latency) * 1000:.0f}ms)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
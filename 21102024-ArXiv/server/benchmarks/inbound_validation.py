@@ -0,0 +1,85 @@
+"""
+Microbenchmark for InboundMessage validation, per message type, on one core.
+Compares the old path (request.json(), then a fresh TypeAdapter over the plain
+Union per request) with the prebuilt discriminated InboundMessageAdapter
+validating the raw request bytes.
+
+    python -m benchmarks.inbound_validation --seconds 1
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Union
+
+from pydantic import TypeAdapter
+
+from benchmarks.relay_load import SERVER_DIR
+
+sys.path.insert(0, os.path.join(SERVER_DIR, "rcs"))
+
+from rcs_types import (  # noqa: E402
+    InboundActionMessage,
+    InboundLocationMessage,
+    InboundMediaMessage,
+    InboundMessageAdapter,
+    InboundTextMessage,
+)
+
+PlainInboundMessage = Union[
+    InboundTextMessage,
+    InboundMediaMessage,
+    InboundActionMessage,
+    InboundLocationMessage,
+]
+
+BASE = {"from": "+15550000000", "to": "+15551111111", "metadata": {"timestamp": "2024-10-21T08:00:00Z"}}
+MESSAGES = {
+    "text": {**BASE, "messageType": "text", "text": "What's new in cs.AI today?"},
+    "media": {
+        **BASE,
+        "messageType": "media",
+        "text": "look at this",
+        "mediaUrls": [{"type": "image/png", "url": "https://example.com/figure.png"}],
+    },
+    "action": {**BASE, "messageType": "action", "actionTitle": "Summarize", "payload": "PAPER_2410.00001"},
+    "location": {**BASE, "messageType": "location", "coordinates": {"lat": 37.77, "lng": -122.42}},
+}
+
+
+def old_path(body):
+    return TypeAdapter(PlainInboundMessage).validate_python(json.loads(body))
+
+
+def new_path(body):
+    return InboundMessageAdapter.validate_json(body)
+
+
+def rate(func, body, seconds):
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            func(body)
+        count += 100
+    return count / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=1.0, help="time spent on each type and path")
+    args = parser.parse_args()
+
+    print(f"{'type':<9} {'old msgs/s':>12} {'new msgs/s':>12} {'speedup':>8}")
+    for message_type, message in MESSAGES.items():
+        body = json.dumps(message).encode()
+        old, new = old_path(body), new_path(body)
+        assert type(old) is type(new) and old == new, message_type
+        old_rate = rate(old_path, body, args.seconds)
+        new_rate = rate(new_path, body, args.seconds)
+        print(f"{message_type:<9} {old_rate:12,.0f} {new_rate:12,.0f} {new_rate / old_rate:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Per-request logging overhead in rcs_server. Text messages are posted one after
+another in ack-first mode with message handling stubbed out, so the request
+path is just validation, logging and queueing. Logging is measured off, with a
+synchronous stdout handler (the old setup) and through the queue to the
+background writer, against a stream that takes --write-delay seconds per write
+to stand in for a backed-up log pipe.
+
+    python -m benchmarks.logging_overhead --requests 2000 --write-delay 0.0005
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+from benchmarks.relay_load import SERVER_DIR, percentile
+
+
+class SlowStream:
+    """Discards output after waiting delay seconds per write."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def write(self, text):
+        if self.delay:
+            time.sleep(self.delay)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+async def run(rcs_server, requests):
+    import httpx
+
+    headers = {"pinnacle-signing-secret": os.environ["PINNACLE_SIGNING_SECRET"]}
+    body = json.dumps({"from": "+15550000000", "to": "+15551111111", "messageType": "text", "text": "hello"})
+    latencies = []
+    async with rcs_server.lifespan(rcs_server.app):
+        transport = httpx.ASGITransport(app=rcs_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://relay") as client:
+            for _ in range(requests):
+                start = time.perf_counter()
+                response = await client.post("/", content=body, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+                # Let the queue workers run, as waiting on the network would
+                await asyncio.sleep(0)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--write-delay", type=float, default=0.0005, help="seconds per write to the log stream")
+    args = parser.parse_args()
+
+    os.environ.setdefault("RCS_URL", "http://127.0.0.1:9/api/rcs")
+    os.environ.setdefault("PINNACLE_SIGNING_SECRET", "benchmark")
+    os.environ.setdefault("WARM_CACHES_ON_STARTUP", "false")
+    os.environ.setdefault("PINNACLE_API_KEY", "benchmark")
+    os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+    os.environ.setdefault("SUPABASE_KEY", "benchmark.benchmark.benchmark")
+    sys.path.insert(0, os.path.join(SERVER_DIR, "rcs"))
+
+    import rcs_server
+    from log_config import JsonFormatter
+
+    async def handled(inbound_msg):
+        pass
+
+    rcs_server.ACK_FIRST = True
+    rcs_server.handle_message = lambda app, inbound_msg: handled(inbound_msg)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    root = logging.getLogger()
+    queue_handler = root.handlers[0]
+    for delay in sorted({0.0, args.write_delay}):
+        stream_handler = logging.StreamHandler(SlowStream(delay))
+        stream_handler.setFormatter(JsonFormatter())
+        for label, level, handlers in (
+            ("off", logging.WARNING, [queue_handler]),
+            ("synchronous", logging.INFO, [stream_handler]),
+            ("queued", logging.INFO, [queue_handler]),
+        ):
+            root.setLevel(level)
+            root.handlers = handlers
+            rcs_server.log_listener.handlers = (stream_handler,)
+            queue_handler.dropped = 0
+            latencies = asyncio.run(run(rcs_server, args.requests))
+            print(
+                f"write delay {delay * 1000:4.1f}ms  {label:<12} p50 {percentile(latencies, 50) * 1000:6.3f}ms "
+                f"p99 {percentile(latencies, 99) * 1000:6.3f}ms  ({queue_handler.dropped} records dropped)"
+            )
+    root.handlers = [queue_handler]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Crash and resume a digest run through the outbox. A child process starts
+delivering a digest to every subscriber and is killed partway through; the
+parent then resumes the digest from the same outbox and checks that every
+subscriber was delivered. Delivery is at-least-once: a request in flight when
+the first run was killed is sent again, so a few subscribers may be counted
+twice. --honour-idempotency-keys shows what an API deduplicating on the
+Idempotency-Key header would absorb; the Pinnacle API does not document one.
+
+    python -m benchmarks.outbox --subscribers 300 --kill-after 2
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_pinnacle import FakePinnacleServer
+
+ENV_DEFAULTS = {
+    "PINNACLE_API_KEY": "benchmark",
+    "SUPABASE_URL": "http://localhost:54321",
+    "SUPABASE_KEY": "benchmark.benchmark.benchmark",
+    "SEND_BACKOFF_SECONDS": "0.05",
+    "SEND_RATE_PER_SECOND": "50",
+    "SEND_BURST": "50",
+    "STATE_BACKEND": "local",
+}
+
+
+def child(subscribers):
+    from arxiv import send_functions
+    from benchmarks.delivery import make_papers
+
+    recipients = [f"+1555{n:07d}" for n in range(subscribers)]
+    send_functions.send_digest(recipients, make_papers())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--kill-after", type=float, default=2.0)
+    parser.add_argument("--honour-idempotency-keys", action="store_true")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    for name, value in ENV_DEFAULTS.items():
+        os.environ.setdefault(name, value)
+    if args.child:
+        child(args.subscribers)
+        return
+
+    server = FakePinnacleServer(
+        args.latency, failure_rate=0.02, honour_idempotency_keys=args.honour_idempotency_keys
+    ).start()
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["PINNACLE_BASE_URL"] = server.url
+        os.environ["OUTBOX_PATH"] = os.path.join(directory, "outbox.sqlite")
+        os.environ["READER_COUNT_CACHE_PATH"] = os.path.join(directory, "reader_counts.sqlite")
+
+        process = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.outbox", "--child", "--subscribers", str(args.subscribers)],
+            stdout=subprocess.DEVNULL,
+        )
+        time.sleep(args.kill_after)
+        process.kill()
+        process.wait()
+        delivered_before = len(server.delivered)
+        print(f"killed the first run after {args.kill_after}s with {delivered_before}/{args.subscribers} delivered")
+
+        from arxiv import send_functions
+
+        outbox = send_functions.DigestOutbox(os.environ["OUTBOX_PATH"])
+        unfinished = outbox.unfinished_digests()
+        start = time.perf_counter()
+        send_functions.resume_unfinished_digests(outbox)
+        print(f"resumed {len(unfinished)} digest(s) in {time.perf_counter() - start:.1f}s")
+
+    duplicates = sum(1 for count in server.delivered.values() if count > 1)
+    print(f"{len(server.delivered)}/{args.subscribers} delivered, {duplicates} delivered twice, "
+          f"{server.replayed} repeated requests absorbed by idempotency keys")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
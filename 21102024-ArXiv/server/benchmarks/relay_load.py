@@ -0,0 +1,141 @@
+"""
+Load test for forwarding inbound text messages from rcs_server to the RCS
+listener. Compares a new httpx.AsyncClient per message (the old behaviour) with
+the shared lifespan-managed client, against a local stub listener.
+
+    python -m benchmarks.relay_load --requests 2000 --concurrency 50
+
+Both the stub and the relay are on localhost over plain HTTP, so this understates
+the saving against a real TLS listener, where every new client also pays a handshake.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_listener(latency):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            body = b'{"status":"ok"}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        # A connection per message needs a deeper accept backlog than the default 5
+        request_queue_size = 1024
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class PerRequestClient:
+    """The old relay: a fresh AsyncClient, and so a fresh connection, per message."""
+
+    async def post(self, *args, **kwargs):
+        import httpx
+
+        async with httpx.AsyncClient() as client:
+            return await client.post(*args, **kwargs)
+
+    async def aclose(self):
+        pass
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))]
+
+
+async def run(rcs_server, relay_client, requests, concurrency):
+    import httpx
+
+    headers = {"pinnacle-signing-secret": os.environ["PINNACLE_SIGNING_SECRET"]}
+    body = json.dumps(
+        {"from": "+15550000000", "to": "+15551111111", "messageType": "text", "text": "hello"}
+    )
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with rcs_server.lifespan(rcs_server.app):
+        await rcs_server.app.state.relay_client.aclose()
+        rcs_server.app.state.relay_client = relay_client
+        transport = httpx.ASGITransport(app=rcs_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://relay") as client:
+
+            async def one():
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.post("/", content=body, headers=headers)
+                    latencies.append(time.perf_counter() - start)
+                    if response.status_code != 200:
+                        raise RuntimeError(response.text)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(one() for _ in range(requests)))
+            elapsed = time.perf_counter() - start
+        await relay_client.aclose()
+    return latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.005, help="stub listener latency in seconds")
+    args = parser.parse_args()
+
+    listener = start_listener(args.latency)
+    os.environ["RCS_URL"] = f"http://127.0.0.1:{listener.server_port}/api/rcs"
+    os.environ.setdefault("PINNACLE_SIGNING_SECRET", "benchmark")
+    os.environ.setdefault("WARM_CACHES_ON_STARTUP", "false")
+    os.environ.setdefault("PINNACLE_API_KEY", "benchmark")
+    os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+    os.environ.setdefault("SUPABASE_KEY", "benchmark.benchmark.benchmark")
+    sys.path.insert(0, os.path.join(SERVER_DIR, "rcs"))
+
+    import rcs_server
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = {}
+    for label, make_client in (
+        ("client per message", PerRequestClient),
+        ("shared pooled client", rcs_server.create_relay_client),
+    ):
+        with contextlib.redirect_stdout(io.StringIO()):
+            latencies, elapsed = asyncio.run(run(rcs_server, make_client(), args.requests, args.concurrency))
+        results[label] = (latencies, elapsed)
+
+    print(f"{args.requests} forwards at concurrency {args.concurrency}, listener latency {args.latency * 1000:.0f}ms")
+    for label, (latencies, elapsed) in results.items():
+        print(
+            f"{label:<21} p50 {percentile(latencies, 50) * 1000:6.1f}ms  p99 {percentile(latencies, 99) * 1000:6.1f}ms  "
+            f"{args.requests / elapsed:7.0f} msg/s"
+        )
+    listener.shutdown()
+
+
+if __name__ == "__main__":
+    main()
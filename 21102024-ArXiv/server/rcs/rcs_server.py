@@ -1,42 +1,170 @@
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
 import uvicorn
 import httpx
-import json
 from dotenv import load_dotenv
 import os
 import sys
-from pydantic import TypeAdapter
-from rcs_types import InboundMessage
+from log_config import sample_raw_payload, setup_logging
+from rcs_types import InboundMessageAdapter
+from work_queue import WorkQueue
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from arxiv import send_functions
 
 
-class JsonFormatter(logging.Formatter):
-    def format(self, record):
-        log_record = {
-            "timestamp": self.formatTime(record, self.datefmt),
-            "level": record.levelname,
-            "message": record.getMessage(),
-            "logger": record.name,
-        }
-        return json.dumps(log_record)
+# Set up logging; records are written to stdout by a background thread
+log_listener = setup_logging()
+logger = logging.getLogger()
 
+load_dotenv()
 
-# Set up logging
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+RCS_URL = os.environ["RCS_URL"]  # Set to dev / prod via this
 
-handler = logging.StreamHandler(sys.stdout)
-handler.setFormatter(JsonFormatter())
-logger.addHandler(handler)
+# Connection pool for forwarding to the RCS listener
+RELAY_MAX_CONNECTIONS = int(os.getenv("RELAY_MAX_CONNECTIONS", 100))
+RELAY_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("RELAY_MAX_KEEPALIVE_CONNECTIONS", 20))
+RELAY_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("RELAY_KEEPALIVE_EXPIRY_SECONDS", 30))
+RELAY_CONNECT_TIMEOUT_SECONDS = float(os.getenv("RELAY_CONNECT_TIMEOUT_SECONDS", 5))
+RELAY_TIMEOUT_SECONDS = float(os.getenv("RELAY_TIMEOUT_SECONDS", 30))
+# Retries of failed connection attempts; a forwarded POST itself is never repeated
+RELAY_RETRIES = int(os.getenv("RELAY_RETRIES", 2))
+RELAY_HTTP2 = os.getenv("RELAY_HTTP2", "true").lower() == "true"
+# Threads for the blocking Supabase / Pinnacle calls in send_functions
+SEND_FUNCTIONS_MAX_WORKERS = int(os.getenv("SEND_FUNCTIONS_MAX_WORKERS", 8))
 
-load_dotenv()
+# Load the current digest papers into the in-process caches on startup
+WARM_CACHES_ON_STARTUP = os.getenv("WARM_CACHES_ON_STARTUP", "true").lower() == "true"
 
-app = FastAPI()
+# Ack-first mode: return 200 once a message is validated and queued, then
+# handle it on a worker pool
+ACK_FIRST = os.getenv("ACK_FIRST", "false").lower() == "true"
+WORK_QUEUE_WORKERS = int(os.getenv("WORK_QUEUE_WORKERS", 16))
+WORK_QUEUE_MAX_SIZE = int(os.getenv("WORK_QUEUE_MAX_SIZE", 1000))
+# Must fit inside terminationGracePeriodSeconds (30s) in porter.yaml
+WORK_QUEUE_DRAIN_SECONDS = float(os.getenv("WORK_QUEUE_DRAIN_SECONDS", 20))
+
+
+def create_relay_client() -> httpx.AsyncClient:
+    http2 = RELAY_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.info("h2 is not installed, forwarding over HTTP/1.1")
+            http2 = False
+
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(RELAY_TIMEOUT_SECONDS, connect=RELAY_CONNECT_TIMEOUT_SECONDS),
+        transport=httpx.AsyncHTTPTransport(
+            http2=http2,
+            retries=RELAY_RETRIES,
+            limits=httpx.Limits(
+                max_connections=RELAY_MAX_CONNECTIONS,
+                max_keepalive_connections=RELAY_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=RELAY_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        ),
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled client for the life of the server, so forwards reuse warm connections
+    app.state.relay_client = create_relay_client()
+    app.state.send_executor = ThreadPoolExecutor(
+        max_workers=SEND_FUNCTIONS_MAX_WORKERS, thread_name_prefix="send-functions"
+    )
+    if WARM_CACHES_ON_STARTUP:
+        # In the background, so a slow Supabase does not hold up startup
+        app.state.send_executor.submit(warm_caches)
+    app.state.work_queue = None
+    if ACK_FIRST:
+        app.state.work_queue = WorkQueue(
+            lambda inbound_msg: handle_message(app, inbound_msg),
+            WORK_QUEUE_WORKERS,
+            WORK_QUEUE_MAX_SIZE,
+        )
+        app.state.work_queue.start()
+    try:
+        yield
+    finally:
+        # Finish queued messages before their relay client and executor go away
+        if app.state.work_queue is not None:
+            await app.state.work_queue.drain(WORK_QUEUE_DRAIN_SECONDS)
+        await app.state.relay_client.aclose()
+        app.state.send_executor.shutdown(wait=True)
+
+
+def warm_caches():
+    """
+    Load the popular papers, which are the papers in the latest digest, so
+    SEE_MORE taps and the digest's PAPER_ taps are answered from memory. The cron
+    job's caches live in another process and never reach this one.
+    """
+    try:
+        papers = send_functions.get_most_popular_papers()
+        logger.info("Warmed the paper cache with %s popular papers", len(papers))
+    except Exception as e:
+        logger.error("Warming the paper cache failed: %s", e)
 
-RCS_URL = os.environ["RCS_URL"]  # Set to dev / prod via this
+
+async def run_blocking(app: FastAPI, func, *args):
+    """
+    Run a blocking send_functions call on the bounded executor so a slow Supabase
+    query or RCS send does not stall every other webhook on the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(app.state.send_executor, func, *args)
+
+
+async def handle_message(app: FastAPI, inbound_msg):
+    """
+    Answer ABOUT / SEE_MORE / PAPER_ taps directly, forward everything else to
+    the RCS listener. Returns the listener's response for forwarded messages.
+    """
+    if (
+        inbound_msg.messageType == "action"
+        and (inbound_msg.payload)
+        and (
+            inbound_msg.payload in ["ABOUT", "SEE_MORE"]
+            or inbound_msg.payload.startswith("PAPER_")
+        )
+    ):
+        if inbound_msg.payload == "ABOUT":
+            await run_blocking(app, send_functions.sendAboutProject, inbound_msg.from_)
+        elif inbound_msg.payload == "SEE_MORE":
+            await run_blocking(app, send_functions.sendPopularPapers, inbound_msg.from_)
+        elif inbound_msg.payload.startswith("PAPER_"):
+            await run_blocking(
+                app,
+                send_functions.sendAboutPaper,
+                inbound_msg.from_,
+                inbound_msg.payload.replace("PAPER_", ""),
+            )
+        return None
+
+    # Update the RCS_URL to include the full path
+    logger.info("Attempting to forward message to: %s", RCS_URL)
+
+    # Map the from_ field to from
+    inbound_msg_dict = inbound_msg.model_dump()
+    inbound_msg_dict["from"] = inbound_msg_dict.pop("from_")
+
+    response = await app.state.relay_client.post(url=RCS_URL, json=inbound_msg_dict)
+    response.raise_for_status()
+
+    logger.info(
+        "Message successfully forwarded to RCS listener. Status code: %s",
+        response.status_code,
+    )
+    return response
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 @app.get("/")
@@ -44,103 +172,93 @@ async def welcome():
     return {"message": "Welcome to the Pinnacle API"}
 
 
+@app.get("/cache-stats")
+async def cache_stats():
+    return send_functions.cache_stats()
+
+
+@app.get("/queue-stats")
+async def queue_stats(request: Request):
+    work_queue = request.app.state.work_queue
+    if work_queue is None:
+        return {"enabled": False}
+    return {"enabled": True, **work_queue.stats()}
+
+
 @app.post("/")
 async def receive_message(request: Request):
-    # Log the raw request json
-    json_data = await request.json()
-    logger.info(f"Received raw json: {json_data}")
-    print(f"Received raw json: {json_data}")  # Added print statement
+    body = await request.body()
+    # Log a sample of raw request json at debug level
+    if logger.isEnabledFor(logging.DEBUG) and sample_raw_payload():
+        logger.debug("Received raw json: %s", body.decode())
     if (
         request.headers.get("pinnacle-signing-secret")
         != os.environ["PINNACLE_SIGNING_SECRET"]
     ):
-        print("Invalid signing secret")
+        logger.warning("Invalid signing secret")
         return
 
     try:
-        inbound_msg = TypeAdapter(InboundMessage).validate_python(json_data)
-        print(inbound_msg)
+        inbound_msg = InboundMessageAdapter.validate_json(body)
     except Exception as e:
-        logger.error(f"Error validating inbound message: {str(e)}")
-        print(f"Error validating inbound message: {str(e)}")
+        logger.error("Error validating inbound message: %s", e)
         raise HTTPException(status_code=400, detail="Invalid JSON data")
 
     # Validate the message type
     if inbound_msg.messageType != "text" and inbound_msg.messageType != "action":
-        logger.error(f"Invalid message type: {inbound_msg.messageType}")
-        print(
-            f"Invalid message type: {inbound_msg.messageType}"
-        )  # Added print statement
+        logger.error("Invalid message type: %s", inbound_msg.messageType)
         raise HTTPException(status_code=400, detail="Invalid message type")
 
     # Handle the message based on its type
     if inbound_msg.messageType == "text":
-        logger.info(f"Received message from {inbound_msg.from_}: {inbound_msg.text}")
-        print(
-            f"Received message from {inbound_msg.from_}: {inbound_msg.text}"
-        )  # Added print statement
+        logger.info("Received message from %s: %s", inbound_msg.from_, inbound_msg.text)
     else:  # postback
         logger.info(
-            f"Received postback from {inbound_msg.from_}: {inbound_msg.actionTitle} (Payload: {inbound_msg.payload})"
+            "Received postback from %s: %s (Payload: %s)",
+            inbound_msg.from_,
+            inbound_msg.actionTitle,
+            inbound_msg.payload,
         )
-        print(
-            f"Received postback from {inbound_msg.from_}: {inbound_msg.actionTitle} (Payload: {inbound_msg.payload})"
-        )  # Added print statement
 
-    # Forward the message to the RCS listener
-    async with httpx.AsyncClient() as client:
-        try:
-            # Update the RCS_URL to include the full path
-            logger.info(f"Attempting to forward message to: {RCS_URL}")
-
-            # Map the from_ field to from
-            if (
-                inbound_msg.messageType == "action"
-                and (inbound_msg.payload)
-                and (
-                    inbound_msg.payload in ["ABOUT", "SEE_MORE"]
-                    or inbound_msg.payload.startswith("PAPER_")
-                )
-            ):
-                if inbound_msg.payload == "ABOUT":
-                    send_functions.sendAboutProject(inbound_msg.from_)
-                elif inbound_msg.payload == "SEE_MORE":
-                    send_functions.sendPopularPapers(inbound_msg.from_)
-                elif inbound_msg.payload.startswith("PAPER_"):
-                    send_functions.sendAboutPaper(
-                        inbound_msg.from_, inbound_msg.payload.replace("PAPER_", "")
-                    )
-            else:
-                inbound_msg_dict = inbound_msg.model_dump()
-                inbound_msg_dict["from"] = inbound_msg_dict.pop("from_")
-
-                response = await client.post(url=RCS_URL, json=inbound_msg_dict)
-                response.raise_for_status()
-
-                logger.info(
-                    f"Message successfully forwarded to RCS listener. Status code: {response.status_code}"
-                )
-                return {
-                    "status": "Message received and forwarded to RCS listener",
-                    "rcs_response": response.text,
-                }
-        except httpx.HTTPStatusError as e:
-            logger.error(
-                f"HTTP error forwarding message to RCS listener: {e.response.status_code} - {e.response.text}"
-            )
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error forwarding message to RCS listener: {e.response.status_code} - {e.response.text}",
-            )
-        except httpx.RequestError as e:
-            logger.error(f"Request error forwarding message to RCS listener: {str(e)}")
+    work_queue = request.app.state.work_queue
+    if work_queue is not None:
+        # Per-sender shards keep each sender's messages in order
+        if not work_queue.submit(inbound_msg.from_, inbound_msg):
+            logger.error("Work queue full, rejecting message from %s", inbound_msg.from_)
             raise HTTPException(
-                status_code=500,
-                detail=f"Request error forwarding message to RCS listener: {str(e)}",
+                status_code=503,
+                detail="Message queue is full",
+                headers={"Retry-After": "1"},
             )
-        except Exception as e:
-            logger.error(f"Unexpected error: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+        return {"status": "Message received and queued"}
+
+    # Forward the message to the RCS listener
+    try:
+        response = await handle_message(request.app, inbound_msg)
+        if response is not None:
+            return {
+                "status": "Message received and forwarded to RCS listener",
+                "rcs_response": response.text,
+            }
+    except httpx.HTTPStatusError as e:
+        logger.error(
+            "HTTP error forwarding message to RCS listener: %s - %s",
+            e.response.status_code,
+            e.response.text,
+        )
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error forwarding message to RCS listener: {e.response.status_code} - {e.response.text}",
+        )
+    except httpx.RequestError as e:
+        logger.error("Request error forwarding message to RCS listener: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Request error forwarding message to RCS listener: {str(e)}",
+        )
+    except Exception as e:
+        logger.error("Unexpected error: %s", e)
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
 if __name__ == "__main__":
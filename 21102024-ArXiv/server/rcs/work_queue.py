@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import zlib
+
+logger = logging.getLogger(__name__)
+
+
+class WorkQueue:
+    """
+    Bounded in-process queue of inbound messages, drained by a fixed pool of
+    workers. Each worker owns one shard and messages are sharded by sender, so
+    messages from the same sender are handled one at a time in arrival order.
+    """
+
+    def __init__(self, handler, workers, max_size):
+        self.handler = handler
+        shard_size = max(1, max_size // workers)
+        self.shards = [asyncio.Queue(maxsize=shard_size) for _ in range(workers)]
+        self.max_size = shard_size * workers
+        self.accepting = False
+        self.enqueued = 0
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._tasks = []
+
+    def start(self):
+        self._tasks = [
+            asyncio.create_task(self._worker(shard)) for shard in self.shards
+        ]
+        self.accepting = True
+
+    def submit(self, key, item):
+        """Queue item on key's shard; returns False when closed or the shard is full."""
+        if not self.accepting:
+            self.rejected += 1
+            return False
+        shard = self.shards[zlib.crc32(key.encode()) % len(self.shards)]
+        try:
+            shard.put_nowait(item)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    async def _worker(self, shard):
+        while True:
+            item = await shard.get()
+            try:
+                await self.handler(item)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error("Error processing queued message: %s", e)
+            finally:
+                shard.task_done()
+
+    async def drain(self, timeout):
+        """Stop accepting, wait up to timeout seconds for queued work, then stop the workers."""
+        self.accepting = False
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(shard.join() for shard in self.shards)), timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error(
+                "Work queue drain timed out after %ss, dropping %s messages",
+                timeout,
+                self.depth(),
+            )
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def depth(self):
+        return sum(shard.qsize() for shard in self.shards)
+
+    def stats(self):
+        return {
+            "accepting": self.accepting,
+            "depth": self.depth(),
+            "max_depth": self.max_size,
+            "shard_depths": [shard.qsize() for shard in self.shards],
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
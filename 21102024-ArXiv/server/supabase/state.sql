@@ -0,0 +1,30 @@
+-- Tables the arxiv-cron job keeps its state in between runs (STATE_BACKEND=supabase).
+-- Run once in the Supabase SQL editor.
+
+-- ETag / Last-Modified of each arXiv feed from the last stored download
+create table if not exists "ArxivFeedState" (
+  category text primary key,
+  etag text,
+  last_modified text
+);
+
+-- Digest outbox: one digest per day's papers, one job per subscriber
+create table if not exists "ArxivDigests" (
+  digest_id text primary key,
+  payload text not null,
+  created_at timestamptz not null
+);
+
+create table if not exists "ArxivDigestJobs" (
+  digest_id text not null references "ArxivDigests" (digest_id),
+  phone text not null,
+  idempotency_key text not null,
+  status text not null default 'pending',
+  attempts integer not null default 0,
+  last_error text,
+  updated_at timestamptz not null,
+  primary key (digest_id, phone)
+);
+
+create index if not exists "ArxivDigestJobs_unfinished"
+  on "ArxivDigestJobs" (status) where status in ('pending', 'sending');
@@ -1,7 +1,6 @@
 from fastapi import FastAPI, Request
 from rcs_types import *
 from rcs import Pinnacle
-from pydantic import TypeAdapter
 from dotenv import load_dotenv
 import os
 from datetime import datetime
@@ -22,7 +21,7 @@ get_notes_mode = {}
 
 @app.post("/")
 async def receive_msg(request: Request):
-    json_data = await request.json()
+    body = await request.body()
     if (
         request.headers.get("pinnacle-signing-secret")
         != os.environ["PINNACLE_SIGNING_SECRET"]
@@ -30,7 +29,7 @@ async def receive_msg(request: Request):
         print("Invalid signing secret")
         return
 
-    inbound_msg = TypeAdapter(InboundMessage).validate_python(json_data)
+    inbound_msg = InboundMessageAdapter.validate_json(body)
 
     fromNumber = inbound_msg.from_
 
@@ -2,33 +2,16 @@ import logging
 from fastapi import FastAPI, HTTPException, Request
 import uvicorn
 import httpx
-import json
 from dotenv import load_dotenv
 import os
-import sys
-from pydantic import TypeAdapter
-from rcs_types import InboundMessage
+from log_config import sample_raw_payload, setup_logging
+from rcs_types import InboundMessageAdapter
 from send import *
 
 
-class JsonFormatter(logging.Formatter):
-    def format(self, record):
-        log_record = {
-            "timestamp": self.formatTime(record, self.datefmt),
-            "level": record.levelname,
-            "message": record.getMessage(),
-            "logger": record.name,
-        }
-        return json.dumps(log_record)
-
-
-# Set up logging
+# Set up logging; records are written to stdout by a background thread
+log_listener = setup_logging()
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-
-handler = logging.StreamHandler(sys.stdout)
-handler.setFormatter(JsonFormatter())
-logger.addHandler(handler)
 
 load_dotenv()
 
@@ -44,52 +27,44 @@ async def welcome():
 
 @app.post("/")
 async def receive_message(request: Request):
-    # Log the raw request json
-    json_data = await request.json()
-    logger.info(f"Received raw json: {json_data}")
-    print(f"Received raw json: {json_data}")  # Added print statement
+    body = await request.body()
+    # Log a sample of raw request json at debug level
+    if logger.isEnabledFor(logging.DEBUG) and sample_raw_payload():
+        logger.debug("Received raw json: %s", body.decode())
     if (
         request.headers.get("pinnacle-signing-secret")
         != os.environ["PINNACLE_SIGNING_SECRET"]
     ):
-        print("Invalid signing secret")
+        logger.warning("Invalid signing secret")
         return
 
     try:
-        inbound_msg = TypeAdapter(InboundMessage).validate_python(json_data)
-        print(inbound_msg)
+        inbound_msg = InboundMessageAdapter.validate_json(body)
     except Exception as e:
-        logger.error(f"Error validating inbound message: {str(e)}")
-        print(f"Error validating inbound message: {str(e)}")
+        logger.error("Error validating inbound message: %s", e)
         raise HTTPException(status_code=400, detail="Invalid JSON data")
 
     # Validate the message type
     if inbound_msg.messageType != "text" and inbound_msg.messageType != "action":
-        logger.error(f"Invalid message type: {inbound_msg.messageType}")
-        print(
-            f"Invalid message type: {inbound_msg.messageType}"
-        )  # Added print statement
+        logger.error("Invalid message type: %s", inbound_msg.messageType)
         raise HTTPException(status_code=400, detail="Invalid message type")
 
     # Handle the message based on its type
     if inbound_msg.messageType == "text":
-        logger.info(f"Received message from {inbound_msg.from_}: {inbound_msg.text}")
-        print(
-            f"Received message from {inbound_msg.from_}: {inbound_msg.text}"
-        )  # Added print statement
+        logger.info("Received message from %s: %s", inbound_msg.from_, inbound_msg.text)
     else:  # postback
         logger.info(
-            f"Received postback from {inbound_msg.from_}: {inbound_msg.actionTitle} (Payload: {inbound_msg.payload})"
+            "Received postback from %s: %s (Payload: %s)",
+            inbound_msg.from_,
+            inbound_msg.actionTitle,
+            inbound_msg.payload,
         )
-        print(
-            f"Received postback from {inbound_msg.from_}: {inbound_msg.actionTitle} (Payload: {inbound_msg.payload})"
-        )  # Added print statement
 
     # Forward the message to the RCS listener
     async with httpx.AsyncClient() as client:
         try:
             # Update the RCS_URL to include the full path
-            logger.info(f"Attempting to forward message to: {RCS_URL}")
+            logger.info("Attempting to forward message to: %s", RCS_URL)
 
             # Map the from_ field to from
             if (
@@ -112,7 +87,8 @@ async def receive_message(request: Request):
                 response.raise_for_status()
 
                 logger.info(
-                    f"Message successfully forwarded to RCS listener. Status code: {response.status_code}"
+                    "Message successfully forwarded to RCS listener. Status code: %s",
+                    response.status_code,
                 )
                 return {
                     "status": "Message received and forwarded to RCS listener",
@@ -120,20 +96,22 @@ async def receive_message(request: Request):
                 }
         except httpx.HTTPStatusError as e:
             logger.error(
-                f"HTTP error forwarding message to RCS listener: {e.response.status_code} - {e.response.text}"
+                "HTTP error forwarding message to RCS listener: %s - %s",
+                e.response.status_code,
+                e.response.text,
             )
             raise HTTPException(
                 status_code=500,
                 detail=f"Error forwarding message to RCS listener: {e.response.status_code} - {e.response.text}",
             )
         except httpx.RequestError as e:
-            logger.error(f"Request error forwarding message to RCS listener: {str(e)}")
+            logger.error("Request error forwarding message to RCS listener: %s", e)
             raise HTTPException(
                 status_code=500,
                 detail=f"Request error forwarding message to RCS listener: {str(e)}",
             )
         except Exception as e:
-            logger.error(f"Unexpected error: {str(e)}")
+            logger.error("Unexpected error: %s", e)
             raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
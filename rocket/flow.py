@@ -1,7 +1,6 @@
 from fastapi import FastAPI, Request
 from rcs_types import *
 from rcs import Pinnacle
-from pydantic import TypeAdapter
 import messages
 import database
 from dotenv import load_dotenv
@@ -21,7 +20,7 @@ PINNACLE_PENTHOUSE_PASSWORD = os.environ["PINNACLE_PENTHOUSE_PASSWORD"]
 
 @app.post("/")
 async def receive_msg(request: Request):
-    json_data = await request.json()
+    body = await request.body()
     if (
         request.headers.get("pinnacle-signing-secret")
         != os.environ["PINNACLE_SIGNING_SECRET"]
@@ -29,7 +28,7 @@ async def receive_msg(request: Request):
         print("Invalid signing secret")
         return
 
-    inbound_msg = TypeAdapter(InboundMessage).validate_python(json_data)
+    inbound_msg = InboundMessageAdapter.validate_json(body)
     print(inbound_msg)
 
     fromNumber = inbound_msg.from_
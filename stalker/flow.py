@@ -1,7 +1,6 @@
 from fastapi import FastAPI, Request
 from rcs_types import *
 from rcs import Pinnacle
-from pydantic import TypeAdapter
 import messages
 import database
 from dotenv import load_dotenv
@@ -19,7 +18,7 @@ AGENT_ID = os.environ["PINNACLE_AGENT_ID"]
 
 @app.post("/")
 async def receive_msg(request: Request):
-    json_data = await request.json()
+    body = await request.body()
     if (
         request.headers.get("pinnacle-signing-secret")
         != os.environ["PINNACLE_SIGNING_SECRET"]
@@ -27,7 +26,7 @@ async def receive_msg(request: Request):
         print("Invalid signing secret")
         return
 
-    inbound_msg = TypeAdapter(InboundMessage).validate_python(json_data)
+    inbound_msg = InboundMessageAdapter.validate_json(body)
 
     fromNumber = inbound_msg.from_
 
@@ -1,5 +1,5 @@
-from typing_extensions import Optional, Union, List, Literal, TypedDict, Sequence
-from pydantic import BaseModel, Field
+from typing_extensions import Optional, Union, List, Literal, TypedDict, Sequence, Annotated
+from pydantic import BaseModel, Field, TypeAdapter
 from rcs import Card, Action
 
 
@@ -61,13 +61,20 @@ class InboundLocationMessage(InboundMessageBase):
     coordinates: Coordinates
 
 
-InboundMessage = Union[
-    InboundTextMessage,
-    InboundMediaMessage,
-    InboundActionMessage,
-    InboundLocationMessage,
+# messageType picks the model directly instead of trying each one in turn
+InboundMessage = Annotated[
+    Union[
+        InboundTextMessage,
+        InboundMediaMessage,
+        InboundActionMessage,
+        InboundLocationMessage,
+    ],
+    Field(discriminator="messageType"),
 ]
 
+# Built once at import rather than per request
+InboundMessageAdapter = TypeAdapter(InboundMessage)
+
 
 class RCSMessage(TypedDict, total=False):
     text: Optional[str]